@@ -67,11 +67,17 @@ struct StatusBlock {
     uint8_t  collision_normal;   // 0x94: from normal array at +0x1B30
     uint8_t  _coll_pad[3];       // 0x95-0x97
     int32_t  collision_slope;    // 0x98: slope angle from normal+0x08
-    uint32_t _pad3;              // 0x9C: padding for alignment
+    uint32_t frame_check;        // 0x9C: copy of frame, stored last — a reader whose
+                                 //       copy has frame != frame_check raced a write
 };
 
 static_assert(sizeof(StatusBlock) == 160, "StatusBlock size mismatch");
 
+// sd:/smm2-hooks/status_ring.bin: the last STATUS_RING_SLOTS blocks, each
+// written to slot (frame % STATUS_RING_SLOTS) right after status.bin, so
+// host tools can read recent per-frame history from a fixed-size file.
+constexpr uint32_t STATUS_RING_SLOTS = 64;
+
 // static_assert to be updated after size is confirmed
 
 void init();
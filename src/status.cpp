@@ -13,10 +13,14 @@ namespace smm2 {
 namespace status {
 
 static const char* STATUS_PATH = "sd:/smm2-hooks/status.bin";
+static const char* RING_PATH = "sd:/smm2-hooks/status_ring.bin";
 static uintptr_t s_player = 0;
 static uint8_t s_mode = 0;  // 0=editor, 1=playing
 static uint32_t s_last_procframe = 0;    // last frame from procFrame_ callback
 static uint32_t s_input_poll_frame = 0;  // monotonic counter from input polls
+// status_ring.bin stays open for the session: one WriteFile per frame
+static nn::fs::FileHandle s_ring;
+static bool s_ring_open = false;
 
 // Hook PlayerObject_changeState to track player pointer.
 // 
@@ -65,6 +69,10 @@ void init() {
         nn::fs::WriteFile(f, 0, &blk, sizeof(blk), opt);
         nn::fs::CloseFile(f);
     }
+    // Fresh (zeroed) history each boot
+    nn::fs::DeleteFile(RING_PATH);
+    nn::fs::CreateFile(RING_PATH, sizeof(StatusBlock) * STATUS_RING_SLOTS);
+    s_ring_open = nn::fs::OpenFile(&s_ring, RING_PATH, nn::fs::MODE_WRITE) == 0;
     playerChangeState_hook.installAtSym<"PlayerObject_changeState">();
 }
 
@@ -216,9 +224,17 @@ void update(uint32_t frame) {
         if (nn::fs::OpenFile(&f, STATUS_PATH, nn::fs::MODE_WRITE) != 0)
             return;  // still can't open, give up this frame
     }
+    // Last field of the block: readers compare it with frame to spot a
+    // copy taken while this write was in progress
+    blk.frame_check = blk.frame;
     nn::fs::WriteOption opt = {.flags = nn::fs::WRITE_OPTION_FLUSH};
     nn::fs::WriteFile(f, 0, &blk, sizeof(blk), opt);
     nn::fs::CloseFile(f);
+
+    // History slot, through the handle opened in init()
+    if (s_ring_open)
+        nn::fs::WriteFile(s_ring, int64_t(blk.frame % STATUS_RING_SLOTS) * sizeof(blk),
+                          &blk, sizeof(blk), opt);
 }
 
 } // namespace status
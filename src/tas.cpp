@@ -20,8 +20,11 @@ namespace tas {
 //    Good for reproducible test sequences.
 //
 // 2. LIVE MODE: polls sd:/smm2-hooks/input.bin every frame
-//    8 bytes: buttons(u64). Written by host, read by hook.
+//    16 bytes: buttons(u64), stick_lx(i32), stick_ly(i32).
+//    Written by host, read by hook.
 //    Good for real-time remote control from WSL.
+//    Optional queue after the live state (see QUEUE_OFFSET): a batch of
+//    (buttons, frames) steps the hook plays back one frame at a time.
 //
 // If tas.csv exists → script mode. Otherwise → live mode.
 // ============================================================
@@ -83,18 +86,62 @@ struct LiveInput {
     int32_t stick_ly;
 };
 
+// Input queue, appended to input.bin at QUEUE_OFFSET:
+//   seq(u32), count(u32), then count x { buttons(u64), frames(u32), pad(u32) }
+// The host writes the steps first and bumps seq last; a new seq restarts
+// playback (count 0 cancels one). While a queue plays, the live buttons are
+// ignored. Steps are timed in input polls, not frame::current(): procFrame_
+// stalls in the editor, menus and loading, where most queued presses land.
+constexpr size_t QUEUE_OFFSET = 16;
+constexpr int MAX_QUEUE = 64;
+
+struct QueueStep {
+    uint64_t buttons;
+    uint32_t frames;
+    uint32_t pad;
+};
+
+static QueueStep queue[MAX_QUEUE];
+static int queue_len = 0;
+static int queue_idx = 0;
+static uint32_t queue_seq = 0;
+static uint32_t queue_step_end = 0;  // input poll the current step ends on
+static bool queue_started = false;
+
 static bool live_mode = false;
 
+// Returns true if a queue with a new seq was loaded into queue[].
+static bool load_queue(const uint8_t* buf, size_t len) {
+    if (len < QUEUE_OFFSET + 8)
+        return false;
+    uint32_t seq, count;
+    std::memcpy(&seq, buf + QUEUE_OFFSET, 4);
+    std::memcpy(&count, buf + QUEUE_OFFSET + 4, 4);
+    if (seq == queue_seq)
+        return false;
+    queue_seq = seq;
+    size_t avail = (len - QUEUE_OFFSET - 8) / sizeof(QueueStep);
+    if (count > avail) count = (uint32_t)avail;
+    if (count > MAX_QUEUE) count = MAX_QUEUE;
+    std::memcpy(queue, buf + QUEUE_OFFSET + 8, count * sizeof(QueueStep));
+    queue_len = (int)count;
+    queue_idx = 0;
+    queue_started = false;
+    return queue_len > 0;
+}
+
 static bool read_live_input(LiveInput& out) {
     nn::fs::FileHandle f;
     if (nn::fs::OpenFile(&f, "sd:/smm2-hooks/input.bin", nn::fs::MODE_READ) != 0)
         return false;
 
-    uint8_t buf[16];
+    static uint8_t buf[QUEUE_OFFSET + 8 + MAX_QUEUE * sizeof(QueueStep)];
     size_t bytes_read = 0;
     nn::fs::ReadFile(&bytes_read, f, 0, buf, sizeof(buf));
     nn::fs::CloseFile(f);
 
+    load_queue(buf, bytes_read);
+
     if (bytes_read >= 8) {
         std::memcpy(&out.buttons, buf, 8);
         if (bytes_read >= 16) {
@@ -135,15 +182,33 @@ static void update_input() {
         }
     }
 
-    // Live mode: read input file every 2 frames
-    if (live_mode && (frame::current() % 2 == 0)) {
+    // Live mode: read input file every 2 input polls (polls run in every
+    // scene; procFrame_ can stall on an odd frame and never read again)
+    if (live_mode && (s_input_poll_count % 2 == 0)) {
         LiveInput inp;
-        if (read_live_input(inp)) {
+        if (read_live_input(inp) && queue_idx >= queue_len) {
             cur_buttons = inp.buttons;
             cur_lx = inp.stick_lx;
             cur_ly = inp.stick_ly;
         }
     }
+
+    // Queued steps: one step per `frames` input polls, then release
+    if (queue_idx < queue_len) {
+        uint32_t f = s_input_poll_count;
+        if (!queue_started) {
+            queue_step_end = f + queue[queue_idx].frames;
+            queue_started = true;
+        }
+        while (queue_idx < queue_len && f >= queue_step_end) {
+            queue_idx++;
+            if (queue_idx < queue_len)
+                queue_step_end += queue[queue_idx].frames;
+        }
+        cur_buttons = queue_idx < queue_len ? queue[queue_idx].buttons : 0;
+        cur_lx = 0;
+        cur_ly = 0;
+    }
 }
 
 static void inject_buttons(nn::hid::full_key_state* out, int written) {
@@ -176,6 +241,11 @@ void init() {
         // Create input.bin if it doesn't exist
         nn::fs::CreateFile("sd:/smm2-hooks/input.bin", 16);
         live_mode = true;
+        // Adopt the seq already in the file so a queue left over from a
+        // previous session is not replayed
+        LiveInput inp;
+        read_live_input(inp);
+        queue_idx = queue_len;
     }
 
     npad_fullkey_hook.installAtSym<"_ZN2nn3hid13GetNpadStatesEPNS0_16NpadFullKeyStateEiRKj">();
@@ -16,56 +16,117 @@ Commands:
     set-state <s>   Manually set current state (if detection is wrong)
     press <buttons> Press buttons (comma-separated: A,B,RIGHT,ZL,...)
     hold <buttons> <ms>  Hold buttons for duration
+    tap <buttons> [n]    Hold buttons for n game frames (default 6)
     release         Release all buttons
-    status          Show status.bin data
+    status          Show status.bin data (--watch: stream every frame, -v: verbose)
     screenshot      Take a screenshot
     title-skip      Get past the title screen (ZL+ZR or A)
     play            Enter play mode from editor (MINUS)
     make            Enter editor mode from play (MINUS)
+    batch           Run commands from stdin, one per line, in one process
+                    (e.g. printf 'press A\\nhold MINUS 1500\\n' | automate.py batch)
+
+Options:
+    --invalidate-state-cache  Re-read nav_state.txt on every check (use when
+                              another process also writes it)
 """
 
+import atexit
+import collections
+import enum
+import functools
+import itertools
+import logging
+import math
+import mmap
+import operator
+import select
+import shlex
+import signal
 import struct
 import sys
+import threading
 import time
+import types
 import os
 import subprocess
-try:
-    from dotenv import load_dotenv
-    _repo_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-    load_dotenv(os.path.join(_repo_root, ".env"))
-except ImportError:
-    # python-dotenv not installed — fall back to manual .env parsing
-    _repo_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-    _env_path = os.path.join(_repo_root, ".env")
-    if os.path.exists(_env_path):
-        with open(_env_path) as _f:
-            for _line in _f:
-                _line = _line.strip()
-                if _line and not _line.startswith('#') and '=' in _line:
-                    _k, _v = _line.split('=', 1)
-                    os.environ.setdefault(_k.strip(), _v.strip())
+
+import statuswatch
+
+# Navigation progress and goto() route tracing. main() sends it to stderr at
+# AUTOMATE_LOG (default INFO) from a listener thread, so a slow terminal
+# never stalls a timed input sequence; AUTOMATE_LOG=WARNING keeps scripted
+# navigation quiet. CLI results are plain print()s on stdout, which the
+# listener's asynchronous writes therefore can't interleave with.
+log = logging.getLogger("automate")
+
+_TOOLS_DIR = os.path.dirname(os.path.abspath(__file__))
+_repo_root = os.path.dirname(_TOOLS_DIR)
+
+
+def _read_env_file(path):
+    """Minimal KEY=value .env reader; never overrides variables already set."""
+    try:
+        with open(path, 'rb') as f:
+            buf = f.read()
+    except FileNotFoundError:
+        return
+    for line in buf.splitlines():
+        k, eq, v = line.partition(b'=')
+        k = k.strip()
+        if eq and k and not k.startswith(b'#'):
+            os.environ.setdefault(k.decode(), v.strip().decode())
+
+
+# When the shell already exports the SD path, skip importing python-dotenv and
+# its tokenizer (a per-invocation cost); the plain reader still fills in any
+# other .env keys (mod paths, CAPTURE_EXE, ...).
+_ENV_FILE = os.path.join(_repo_root, ".env")
+if os.environ.get("EDEN_SD_PATH" if "--eden" in sys.argv else "RYUJINX_SD_PATH"):
+    _read_env_file(_ENV_FILE)
+else:
+    try:
+        from dotenv import load_dotenv
+        load_dotenv(_ENV_FILE)
+    except ImportError:
+        # python-dotenv not installed — fall back to manual .env parsing
+        _read_env_file(_ENV_FILE)
 
 # Paths (all configurable via .env)
 # Support --eden flag to use Eden emulator paths instead of Ryujinx
 _use_eden = "--eden" in sys.argv
 _no_gdb = "--no-gdb" in sys.argv
+# Another process may write nav_state.txt; re-read it on every detect_state
+_no_state_cache = "--invalidate-state-cache" in sys.argv
 if _use_eden:
     sys.argv.remove("--eden")
 if _no_gdb:
     sys.argv.remove("--no-gdb")
+if _no_state_cache:
+    sys.argv.remove("--invalidate-state-cache")
 
+# Run as a script, a missing SD path is fatal. Imported (e.g. by smm2.Game for
+# screenshots), it is left empty for set_emulator() to fill in.
 if _use_eden:
     SD_BASE = os.environ.get("EDEN_SD_PATH", "")
-    if not SD_BASE:
+    if not SD_BASE and __name__ == "__main__":
         print("Error: EDEN_SD_PATH not set in .env")
         sys.exit(1)
 else:
     SD_BASE = os.environ.get("RYUJINX_SD_PATH", "")
-    if not SD_BASE:
+    if not SD_BASE and __name__ == "__main__":
         print("Error: RYUJINX_SD_PATH not set. Copy .env.example to .env and configure it.")
         sys.exit(1)
 INPUT_BIN = os.path.join(SD_BASE, "input.bin")
-SCREENSHOT_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "screenshot_ryujinx.ps1")
+STATUS_BIN = os.path.join(SD_BASE, "status.bin")
+FIELDS_CSV = os.path.join(SD_BASE, "fields.csv")
+STATUS_RING_BIN = os.path.join(SD_BASE, "status_ring.bin")
+# Persistent state file — written after every navigation action
+_STATE_FILE = os.path.join(SD_BASE, "nav_state.txt")
+_paths_base = SD_BASE   # SD_BASE that the paths above were built from
+SCREENSHOT_SCRIPT = os.path.join(_TOOLS_DIR, "screenshot_ryujinx.ps1")
+_BUILD_NSO = os.path.join(_repo_root, "build", "smm2-hooks.nso")
+_BUILD_NPDM = os.path.join(_repo_root, "build", "main.npdm")
 
 def set_emulator(emu='eden'):
     """Switch SD_BASE to a different emulator. Call before using read_status/write_input."""
@@ -77,235 +138,998 @@ def set_emulator(emu='eden'):
         SD_BASE = os.environ.get("RYUJINX_SD_PATH", "")
         _use_eden = False
     INPUT_BIN = os.path.join(SD_BASE, "input.bin")
+    _sync_paths()
+    _close_status_fd()
+    _close_input_fd()
+
+
+def _sync_paths():
+    """Rebuild STATUS_BIN/FIELDS_CSV/STATUS_RING_BIN/_STATE_FILE if SD_BASE
+    was reassigned (tests and callers may set automate.SD_BASE directly)."""
+    global STATUS_BIN, FIELDS_CSV, STATUS_RING_BIN, _STATE_FILE, _paths_base
+    if SD_BASE != _paths_base:
+        STATUS_BIN = os.path.join(SD_BASE, "status.bin")
+        FIELDS_CSV = os.path.join(SD_BASE, "fields.csv")
+        STATUS_RING_BIN = os.path.join(SD_BASE, "status_ring.bin")
+        _STATE_FILE = os.path.join(SD_BASE, "nav_state.txt")
+        _paths_base = SD_BASE
+
+
 SCREENSHOT_OUT = os.environ.get("SCREENSHOT_OUT", "/mnt/c/temp/smm2_debug/capture.png")
 WSL_DISTRO = os.environ.get("WSL_DISTRO", "Ubuntu")
-
-# Button bitmasks (Pro Controller / HID)
-BUTTONS = {
-    "A":     0x01,
-    "B":     0x02,
-    "X":     0x04,
-    "Y":     0x08,
-    "L":     0x40,
-    "R":     0x80,
-    "ZL":    0x100,
-    "ZR":    0x200,
-    "PLUS":  0x400,
-    "MINUS": 0x800,
-    "LEFT":  0x1000,
-    "UP":    0x2000,
-    "RIGHT": 0x4000,
-    "DOWN":  0x8000,
-    "LSTICK": 0x20000,
-    "RSTICK": 0x40000,
+# Optional Windows.Graphics.Capture helper: `<exe> <process name> <win path>`
+# writes a PNG of that process's main window and exits 0. PrintWindow via
+# PowerShell is used when unset or when the helper fails (WGC needs Win10 1903+).
+CAPTURE_EXE = os.environ.get("CAPTURE_EXE", "")
+
+class Btn(enum.IntFlag):
+    """Button bitmasks (Pro Controller / HID). Internal callers combine
+    these directly (Btn.L | Btn.R); strings are for CLI arguments."""
+    A = 0x01
+    B = 0x02
+    X = 0x04
+    Y = 0x08
+    L = 0x40
+    R = 0x80
+    ZL = 0x100
+    ZR = 0x200
+    PLUS = 0x400
+    MINUS = 0x800
+    LEFT = 0x1000
+    UP = 0x2000
+    RIGHT = 0x4000
+    DOWN = 0x8000
+    LSTICK = 0x20000
+    RSTICK = 0x40000
+
+
+# Name -> mask view of Btn, for parse_buttons(). Read-only: _BUTTON_CACHE is
+# derived from it, so the table must not change after import.
+BUTTONS = types.MappingProxyType({b.name: b for b in Btn})
+
+# Button string -> mask memo. Seeded with every 1-3 button chord in BUTTONS
+# order, spelled "A,B" or "A+B"; any other spelling is added on first parse,
+# so every repeat parse_buttons() call is one dict lookup.
+_BUTTON_CACHE = {
+    sep.join(names): functools.reduce(operator.or_, (BUTTONS[n] for n in names))
+    for n in (1, 2, 3)
+    for names in itertools.combinations(BUTTONS, n)
+    for sep in (',', '+')
 }
 
+# Precompiled layouts for input.bin and status.bin (see include/smm2/status.h)
+_S_INPUT = struct.Struct('<Qii')     # buttons, stick_lx, stick_ly
+# input.bin step queue after the live block (see src/tas.cpp): seq, count, then
+# count x (buttons, frames); the hook plays it back one input poll at a time
+_S_QUEUE_HEAD = struct.Struct('<II')
+_S_QUEUE_STEP = struct.Struct('<QI4x')
+_QUEUE_MAX = 64
+_INPUT_SIZE = _S_INPUT.size + _S_QUEUE_HEAD.size + _QUEUE_MAX * _S_QUEUE_STEP.size
+# status.bin blocks, one Struct per supported size (no padding between fields):
+#   v1 (32 B): frame, game_phase, player_state, powerup_id, pos_x, pos_y, vel_x, vel_y
+#   v2 (64 B): + state_frames, in_water, is_dead, is_goal, has_player, facing,
+#              gravity, buffered_action, input_polls, real_game_phase
+#   v3 (68 B): + course_theme, 3 pad bytes, game_style
+_S_STATUS_V1 = struct.Struct('<IIIIffff')
+_S_STATUS_V2 = struct.Struct('<IIIIffffIBBBBffIIi')
+_S_STATUS_V3 = struct.Struct('<IIIIffffIBBBBffIIiB3xI')
+_S_U32 = struct.Struct('<I')         # single-field peeks (frame, player_state)
+_S_I32 = struct.Struct('<i')
+_S_F32 = struct.Struct('<f')
+_S_U8 = struct.Struct('<B')          # single-byte peeks (has_player)
+# detect_state() inputs only: player_state @8, has_player @39, real_game_phase @56
+_S_DETECT = struct.Struct('<8xI27xB16xi')
+# Full hook block (include/smm2/status.h): frame_check @0x9C is a copy of
+# frame written last, so a copy whose two frames differ was torn by a write
+_STATUS_BLOCK_SIZE = 160
+_RING_SLOTS = 64        # status_ring.bin: STATUS_RING_SLOTS in status.h
+_S_FRAME_CHECK = struct.Struct('<I152xI')
+_TORN_RETRIES = 3
+
+
+# input.bin is kept open and mmap'd (keyed by path; INPUT_BIN changes with
+# set_emulator()), so a button edge is a store into the mapping. Timing-critical
+# writes are msync'd so the edge is in the file before the caller starts
+# timing its hold; pwrite(+fdatasync) is the fallback when mmap is refused.
+_input_fd = None
+_input_mm = None
+_input_fd_path = None
+
+
+def _get_input_map():
+    """Return (fd, mapping) for INPUT_BIN, creating the file if needed.
+    mapping is None when the filesystem doesn't support mmap."""
+    global _input_fd, _input_mm, _input_fd_path
+    if _input_fd is None or _input_fd_path != INPUT_BIN:
+        _close_input_fd()
+        _input_fd = os.open(INPUT_BIN, os.O_RDWR | os.O_CREAT, 0o644)
+        _input_fd_path = INPUT_BIN
+        if os.fstat(_input_fd).st_size < _INPUT_SIZE:
+            os.ftruncate(_input_fd, _INPUT_SIZE)
+        try:
+            _input_mm = mmap.mmap(_input_fd, _INPUT_SIZE)
+        except (ValueError, OSError):
+            _input_mm = None
+    return _input_fd, _input_mm
+
+
+def _close_input_fd():
+    """Drop the cached input.bin mapping/fd (next write_input() reopens them)."""
+    global _input_fd, _input_mm, _input_fd_path
+    if _input_mm is not None:
+        _input_mm.close()
+    if _input_fd is not None:
+        try:
+            os.close(_input_fd)
+        except OSError:
+            pass
+    _input_fd = _input_mm = _input_fd_path = None
+
+
+def _put_input(buttons, stick_lx, stick_ly, sync):
+    """Store one input block; with sync, flush it to the file before returning."""
+    fd, mm = _get_input_map()
+    if mm is not None:
+        _S_INPUT.pack_into(mm, 0, buttons, stick_lx, stick_ly)
+        if sync:
+            mm.flush(0, _S_INPUT.size)
+    else:
+        os.pwrite(fd, _S_INPUT.pack(buttons, stick_lx, stick_ly), 0)
+        if sync:
+            os.fdatasync(fd)
+
+
+def queue_input(steps):
+    """Hand [(buttons, duration_ms), ...] to the hook in one input.bin write.
+
+    The hook plays the steps back on its input polls, one per game frame in
+    every scene (durations rounded to whole frames, at least one), and
+    releases after the last; live writes are ignored until then. No steps
+    cancels a queue that is still playing. Returns the playback length in
+    frames at once.
+    """
+    if len(steps) > _QUEUE_MAX:
+        raise ValueError(f"queue_input: {len(steps)} steps (max {_QUEUE_MAX})")
+    body = bytearray(_S_QUEUE_HEAD.size + len(steps) * _S_QUEUE_STEP.size)
+    total = 0
+    for i, (buttons, duration_ms) in enumerate(steps):
+        mask = buttons if isinstance(buttons, int) else parse_buttons(buttons)
+        frames = max(1, round(duration_ms * 60 / 1000))
+        _S_QUEUE_STEP.pack_into(body, _S_QUEUE_HEAD.size + i * _S_QUEUE_STEP.size, mask, frames)
+        total += frames
+    fd, mm = _get_input_map()
+    # Steps first, then the header: a new seq is what starts playback
+    head_at = _S_INPUT.size
+    if mm is not None:
+        seq = _S_QUEUE_HEAD.unpack_from(mm, head_at)[0] + 1
+        mm[head_at + _S_QUEUE_HEAD.size:head_at + len(body)] = body[_S_QUEUE_HEAD.size:]
+        _S_QUEUE_HEAD.pack_into(mm, head_at, seq & 0xFFFFFFFF, len(steps))
+        mm.flush(0, _INPUT_SIZE)
+    else:
+        seq = _S_QUEUE_HEAD.unpack(os.pread(fd, _S_QUEUE_HEAD.size, head_at))[0] + 1
+        os.pwrite(fd, body[_S_QUEUE_HEAD.size:], head_at + _S_QUEUE_HEAD.size)
+        os.pwrite(fd, _S_QUEUE_HEAD.pack(seq & 0xFFFFFFFF, len(steps)), head_at)
+        os.fdatasync(fd)
+    return total
+
+
+def cancel_queue():
+    """Stop queued playback. The live block is released first, so the hook
+    goes back to no buttons rather than whatever was last written there."""
+    write_input(0)
+    queue_input([])
+
+
+def play_queued(steps):
+    """queue_input(steps), then wait for status.bin's input poll count (the
+    clock the hook plays the queue on) to pass the last step.
+
+    Returns True once played. On timeout the queue is cancelled, so nothing
+    stays held, and False is returned. Falls back to the wall-clock length
+    when status.bin has no poll count.
+    """
+    peek = _FIELD_PEEKS['input_polls']
+    start = peek()
+    frames = queue_input(steps)
+    if start is None:
+        wait(frames * 1000 / 60)
+        return True
+    end = start + frames
+    if _poll_until(lambda p: p >= end, 'queue', frames / 30 + 1, interval=0.05,
+                   peek=peek) is None:
+        cancel_queue()
+        return False
+    return True
+
+
+def wait_frames(n, timeout_s=None):
+    """Wait until the game frame counter has advanced n frames.
+
+    Returns the status at that frame, or None on timeout (default: twice the
+    nominal 60 fps length plus a second). Without status.bin this is a plain
+    wall-clock wait of n/60 s.
+    """
+    start = _peek_frame()
+    if start is None:
+        wait(n * 1000 / 60)
+        return None
+    end = start + n
+    if timeout_s is None:
+        timeout_s = n / 30 + 1
+    return _poll_until(lambda f: f >= end, 'frames', timeout_s,
+                       interval=1 / 240, peek=_peek_frame)
+
+
+def press_frames(buttons, frames=6):
+    """Hold buttons for a number of game frames (not milliseconds), then
+    release, so the press covers the same frames regardless of host timing."""
+    mask = buttons if isinstance(buttons, int) else parse_buttons(buttons)
+    write_input(mask)
+    wait_frames(frames)
+    write_input(0)
+
 
 def write_input(buttons=0, stick_lx=0, stick_ly=0):
-    """Write controller state to input.bin for the TAS plugin to read."""
-    data = struct.pack('<Qii', buttons, stick_lx, stick_ly)
-    with open(INPUT_BIN, 'wb') as f:
-        f.write(data)
+    """Write controller state to input.bin for the TAS plugin to read.
+
+    Synchronous: the state is in the file when this returns.
+    """
+    _put_input(buttons, stick_lx, stick_ly, True)
+
+
+def write_input_async(buttons=0, stick_lx=0, stick_ly=0):
+    """write_input() without the sync, for non timing-critical writes."""
+    _put_input(buttons, stick_lx, stick_ly, False)
 
 
 def parse_buttons(button_str):
     """Parse comma-separated button names into bitmask."""
-    mask = 0
-    for name in button_str.upper().split(','):
-        name = name.strip()
-        if name in BUTTONS:
-            mask |= BUTTONS[name]
-        else:
-            print(f"Unknown button: {name}")
-            print(f"Valid: {', '.join(sorted(BUTTONS.keys()))}")
-            sys.exit(1)
+    mask = _BUTTON_CACHE.get(button_str)
+    if mask is None:
+        mask = _BUTTON_CACHE[button_str] = _parse_buttons_slow(button_str)
     return mask
 
 
+def _parse_buttons_slow(button_str):
+    """parse_buttons() for spellings not in _BUTTON_CACHE (case, order, spaces)."""
+    parts = button_str.upper().replace(' ', '').replace('+', ',').split(',')
+    try:
+        return functools.reduce(operator.or_, (BUTTONS[n] for n in parts), Btn(0))
+    except KeyError as e:
+        print(f"Unknown button: {e.args[0]}")
+        print(f"Valid: {', '.join(sorted(BUTTONS.keys()))}")
+        sys.exit(1)
+
+
+# Below this much time left, spin on perf_counter instead of sleeping: the
+# scheduler may oversleep a short time.sleep() by a millisecond or more.
+_SPIN_S = 0.002
+
+
+def _sleep_until(deadline):
+    """Sleep until perf_counter() reaches deadline, spinning for the last bit."""
+    remaining = deadline - time.perf_counter()
+    if remaining > _SPIN_S:
+        time.sleep(remaining - _SPIN_S)
+    while time.perf_counter() < deadline:
+        os.sched_yield()
+
+
+def sequence(steps):
+    """Play a list of (buttons, duration_ms) steps through the input.bin mapping.
+
+    Buttons may be a mask or a button string. Each step is one write followed
+    by its wait, e.g. sequence([("A", 100), (0, 500), ("DOWN", 100), (0, 0)]).
+    Step deadlines are absolute, so durations don't drift over a long sequence.
+    """
+    # Resolve masks first, so an unknown button name exits before any input
+    masks = [buttons if isinstance(buttons, int) else parse_buttons(buttons)
+             for buttons, _ in steps]
+    deadline = time.perf_counter()
+    for mask, (_, duration_ms) in zip(masks, steps):
+        _put_input(mask, 0, 0, True)
+        if duration_ms:
+            deadline += duration_ms / 1000.0
+            _sleep_until(deadline)
+
+
+def press_sequence(taps, gap_ms=120):
+    """Tap each (buttons, tap_ms) in turn with gap_ms released between taps.
+
+    For menu cursor moves: menus latch input within a frame, so the taps are
+    timed against perf_counter deadlines rather than press() + wait(800).
+    """
+    sequence([step for buttons, tap_ms in taps
+              for step in ((buttons, tap_ms), (0, gap_ms))])
+
+
 def press(buttons, duration_ms=100):
     """Press buttons for a duration, then release."""
-    mask = buttons if isinstance(buttons, int) else parse_buttons(buttons)
-    write_input(mask)
-    time.sleep(duration_ms / 1000.0)
-    write_input(0)
+    sequence([(buttons, duration_ms), (0, 0)])
 
 
 def hold(buttons, duration_ms):
     """Hold buttons for a longer duration (e.g., long press)."""
-    mask = buttons if isinstance(buttons, int) else parse_buttons(buttons)
-    write_input(mask)
-    time.sleep(duration_ms / 1000.0)
-    write_input(0)
+    sequence([(buttons, duration_ms), (0, 0)])
 
 
 def wait(ms):
     """Wait without pressing anything."""
-    time.sleep(ms / 1000.0)
+    _sleep_until(time.perf_counter() + ms / 1000.0)
+
+
+# Persistent PowerShell for screenshots: the capture type and function are
+# compiled once, then each screenshot is one `capture` line on stdin framed by
+# an END-<n> sentinel, instead of a fresh powershell.exe (+ Add-Type) per shot.
+_ps_proc = None
+_ps_seq = 0
+_ps_lock = threading.Lock()  # one exchange at a time (screenshot_async thread)
+_PS_SETUP = (
+    "Add-Type -AssemblyName System.Drawing;"
+    "Add-Type -TypeDefinition 'using System;using System.Runtime.InteropServices;"
+    "public class W{[DllImport(\"user32.dll\")]public static extern bool GetWindowRect(IntPtr h,out R r);"
+    "[DllImport(\"user32.dll\")]public static extern bool PrintWindow(IntPtr h,IntPtr d,uint f);"
+    "[StructLayout(LayoutKind.Sequential)]public struct R{public int L,T,Ri,B;}}';"
+    "function capture($n,$o){"
+    "$p=Get-Process -Name $n -EA 0|Select -First 1;"
+    "if(-not $p){return 'NO_PROCESS'};"
+    "$h=$p.MainWindowHandle;"
+    "$r=New-Object W+R;[W]::GetWindowRect($h,[ref]$r)|Out-Null;"
+    "$w=$r.Ri-$r.L;$ht=$r.B-$r.T;"
+    "if($w -le 0 -or $ht -le 0){return 'NO_WINDOW'};"
+    "$b=New-Object Drawing.Bitmap($w,$ht);"
+    "$g=[Drawing.Graphics]::FromImage($b);$dc=$g.GetHdc();[W]::PrintWindow($h,$dc,2)|Out-Null;"
+    "$g.ReleaseHdc($dc);$b.Save($o);$g.Dispose();$b.Dispose();'OK'};"
+    "function capture_region($n,$o,$fx,$fy,$fw,$fh){"
+    "$p=Get-Process -Name $n -EA 0|Select -First 1;"
+    "if(-not $p){return 'NO_PROCESS'};"
+    "$r=New-Object W+R;[W]::GetWindowRect($p.MainWindowHandle,[ref]$r)|Out-Null;"
+    "$w=$r.Ri-$r.L;$ht=$r.B-$r.T;"
+    "$cw=[int]($fw*$w);$ch=[int]($fh*$ht);"
+    "if($cw -le 0 -or $ch -le 0){return 'NO_WINDOW'};"
+    "$b=New-Object Drawing.Bitmap($cw,$ch);$g=[Drawing.Graphics]::FromImage($b);"
+    "$g.CopyFromScreen([int]($r.L+$fx*$w),[int]($r.T+$fy*$ht),0,0,$b.Size);"
+    "$b.Save($o);$g.Dispose();$b.Dispose();'OK'}\n"
+)
+
+# Screen regions for state detection, as (x, y, w, h) fractions of the
+# emulator window so they hold at any window size. Approximate.
+REGION_TITLE_PROMPT = (0.30, 0.80, 0.40, 0.15)   # "Press L + R" prompt
+REGION_MENU_CURSOR = (0.05, 0.15, 0.90, 0.70)    # main menu buttons
+
+
+def _powershell():
+    """Return the shared PowerShell process, starting it if needed (or None)."""
+    global _ps_proc
+    if _ps_proc is not None and _ps_proc.poll() is None:
+        return _ps_proc
+    ps_exe = "/mnt/c/Windows/System32/WindowsPowerShell/v1.0/powershell.exe"
+    if not os.path.exists(ps_exe):
+        ps_exe = "powershell.exe"  # fallback to PATH
+    try:
+        _ps_proc = subprocess.Popen(
+            [ps_exe, "-NoLogo", "-NoProfile", "-NonInteractive", "-Command", "-"],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    except OSError:
+        _ps_proc = None
+        return None
+    _ps_proc.stdin.write(_PS_SETUP.encode())
+    _ps_proc.stdin.flush()
+    return _ps_proc
 
 
-def screenshot(out_path=None):
-    """Take a screenshot of the emulator window and return the WSL path."""
+def _stop_powershell():
+    """End the shared PowerShell at exit: EOF on its stdin lets it finish
+    cleanly; kill it if it hasn't within a couple of seconds."""
+    proc = _ps_proc
+    if proc is None or proc.poll() is not None:
+        return
+    try:
+        proc.stdin.close()
+        proc.wait(timeout=2)
+    except (OSError, subprocess.TimeoutExpired):
+        proc.kill()
+
+atexit.register(_stop_powershell)
+
+
+def _ps_call(command, timeout_s=10):
+    """Run one line in the shared PowerShell and return its output lines.
+
+    Returns None if PowerShell is unavailable or does not answer in time
+    (the process is then killed and restarted on the next call).
+    """
+    global _ps_proc, _ps_seq
+    with _ps_lock:
+        proc = _powershell()
+        if proc is None:
+            return None
+        _ps_seq += 1
+        sentinel = f"END-{_ps_seq}".encode()
+        try:
+            proc.stdin.write(f"{command}; 'END-{_ps_seq}'\n".encode())
+            proc.stdin.flush()
+        except OSError:
+            _ps_proc = None
+            return None
+        fd = proc.stdout.fileno()
+        buf = b""
+        deadline = time.monotonic() + timeout_s
+        while sentinel not in buf:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not select.select([fd], [], [], remaining)[0]:
+                proc.kill()
+                _ps_proc = None
+                return None
+            chunk = os.read(fd, 4096)
+            if not chunk:
+                _ps_proc = None
+                return None
+            buf += chunk
+        lines = buf.decode(errors="replace").splitlines()
+        return [l.strip() for l in lines[:lines.index(sentinel.decode())]]
+
+
+@functools.lru_cache(maxsize=32)
+def _wsl_to_win(path):
+    """/mnt/<drive>/... → (<DRIVE>:\\..., same path quoted for a PowerShell
+    '...' literal). Cached: screenshot paths rarely change."""
+    if path.startswith("/mnt/") and path[6:7] == "/":
+        path = path[5].upper() + ":" + path[6:]
+    win = path.replace("/", "\\")
+    return win, win.replace("'", "''")
+
+
+def screenshot(out_path=None, region=None):
+    """Take a screenshot of the emulator window and return the WSL path.
+
+    region: optional (x, y, w, h) window fractions (e.g. REGION_TITLE_PROMPT);
+    only that rectangle is copied from the screen, which is much cheaper than
+    a full-window capture but needs the window to be unobstructed.
+    """
     emu_name = "eden" if _use_eden else "Ryujinx"
     out = out_path or SCREENSHOT_OUT or "/mnt/c/temp/smm2_debug/capture.png"
-    # Ensure output directory exists
-    win_out = out.replace("/mnt/c/", "C:\\\\").replace("/", "\\\\")
-    ps = f"""
-Add-Type -AssemblyName System.Drawing
-Add-Type @"
-using System;using System.Runtime.InteropServices;using System.Drawing;
-public class W{{[DllImport("user32.dll")]public static extern bool GetWindowRect(IntPtr h,out R r);[DllImport("user32.dll")]public static extern bool PrintWindow(IntPtr h,IntPtr d,uint f);[StructLayout(LayoutKind.Sequential)]public struct R{{public int L,T,Ri,B;}}}}
-"@
-$p=Get-Process -Name {emu_name} -EA 0|Select -First 1
-if(-not $p){{echo "NO_PROCESS";exit 1}}
-$h=$p.MainWindowHandle
-$r=New-Object W+R;[W]::GetWindowRect($h,[ref]$r)|Out-Null
-$w=$r.Ri-$r.L;$ht=$r.B-$r.T
-if($w -le 0 -or $ht -le 0){{echo "NO_WINDOW";exit 1}}
-$b=New-Object Drawing.Bitmap($w,$ht)
-$g=[Drawing.Graphics]::FromImage($b);$dc=$g.GetHdc();[W]::PrintWindow($h,$dc,2)|Out-Null
-$g.ReleaseHdc($dc);$b.Save("{win_out}");$g.Dispose();$b.Dispose()
-echo "OK"
-"""
-    ps_exe = "/mnt/c/Windows/System32/WindowsPowerShell/v1.0/powershell.exe"
-    if not os.path.exists(ps_exe):
-        ps_exe = "powershell.exe"  # fallback to PATH
-    result = subprocess.run([ps_exe, "-Command", ps],
-                          capture_output=True, text=True, timeout=10)
-    if "OK" in result.stdout:
+    win_out, ps_out = _wsl_to_win(out)
+    if region is None and CAPTURE_EXE:
+        try:
+            result = subprocess.run([CAPTURE_EXE, emu_name, win_out],
+                                    stdout=subprocess.DEVNULL,
+                                    stderr=subprocess.DEVNULL, timeout=10)
+            if result.returncode == 0:
+                return out
+        except (OSError, subprocess.TimeoutExpired):
+            pass
+    if region is None:
+        lines = _ps_call(f"capture '{emu_name}' '{ps_out}'")
+    else:
+        lines = _ps_call("capture_region '{}' '{}' {} {} {} {}".format(
+            emu_name, ps_out, *(float(v) for v in region)))
+    if lines is None:
+        print("Screenshot failed: PowerShell unavailable")
+        return None
+    if "OK" in lines:
         return out
-    elif "NO_PROCESS" in result.stdout:
+    elif "NO_PROCESS" in lines:
         print(f"Screenshot failed: {emu_name} not running")
         return None
     else:
-        print(f"Screenshot failed: {result.stdout.strip()}")
+        print(f"Screenshot failed: {' '.join(lines)}")
+        return None
+
+
+_shot_pool = None
+
+
+def screenshot_async(out_path=None, region=None):
+    """screenshot() on a background thread, for captures the caller doesn't
+    wait on (e.g. debug shots mid-sequence). Returns a Future for the path;
+    shots run one at a time and pending ones finish before exit."""
+    global _shot_pool
+    if _shot_pool is None:
+        from concurrent.futures import ThreadPoolExecutor
+        _shot_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="screenshot")
+    return _shot_pool.submit(screenshot, out_path, region)
+
+
+# Cached read-only fd for status.bin, keyed by (path, inode, size) so it is
+# reopened when SD_BASE changes, the hook recreates the file on boot, or the
+# file is resized under a mapping. The hook writes the block in place every
+# frame, so the file is also mmap'd and polled fields are read straight out of
+# the mapping; pread is used on DrvFS mounts (statuswatch.use_mmap(), where
+# Windows-side rewrites don't reliably reach a mapping), with STATUS_MMAP=0,
+# or when the filesystem refuses the mapping.
+_status_fd = None
+_status_fd_key = None
+_status_mm = None
+_PEEK_RECHECK = 32      # peeks between path/inode/size revalidations
+_peek_count = 0
+
+
+def _close_status_fd():
+    """Drop the cached status.bin fd (next read_status() reopens it)."""
+    global _status_fd, _status_fd_key, _status_mm
+    if _status_mm is not None:
+        _status_mm.close()
+    if _status_fd is not None:
+        try:
+            os.close(_status_fd)
+        except OSError:
+            pass
+    _status_fd = _status_fd_key = _status_mm = None
+
+
+_open_ro = statuswatch.open_ro
+
+
+def _get_status_fd(path):
+    """Return a cached fd for status.bin, or None if the file is missing."""
+    global _status_fd, _status_fd_key, _status_mm
+    try:
+        st = os.stat(path)
+        key = (path, st.st_ino, st.st_size)
+    except OSError:
+        _close_status_fd()
         return None
+    if _status_fd is None or _status_fd_key != key:
+        _close_status_fd()
+        try:
+            _status_fd = _open_ro(path)
+        except OSError:
+            return None
+        _status_fd_key = key
+        if statuswatch.use_mmap(path):
+            try:
+                _status_mm = mmap.mmap(_status_fd, 0, access=mmap.ACCESS_READ)
+            except (ValueError, OSError):
+                _status_mm = None
+    return _status_fd
+
+
+def _status_buffer(size):
+    """status.bin for unpack_from(): the live mapping itself (no copy), or the
+    first `size` bytes via pread when mmap is unavailable. None if missing."""
+    _sync_paths()
+    fd = _get_status_fd(STATUS_BIN)
+    if fd is None:
+        return None
+    if _status_mm is not None:
+        return _status_mm
+    try:
+        return os.pread(fd, size, 0)
+    except OSError:
+        _close_status_fd()
+        return None
+
+
+def _peek(st, offset):
+    """Unpack one field with Struct `st` at `offset`, without decoding the block.
+
+    Only revalidates the path every _PEEK_RECHECK calls (or when SD_BASE was
+    reassigned), so tight polling loops touch the mapping alone. Returns None
+    if the field is unavailable.
+    """
+    global _peek_count
+    _peek_count += 1
+    buf = _status_mm
+    if buf is None or _peek_count % _PEEK_RECHECK == 0 or SD_BASE != _paths_base:
+        buf = _status_buffer(offset + st.size)
+        if buf is None:
+            return None
+    if len(buf) < offset + st.size:
+        return None
+    return st.unpack_from(buf, offset)[0]
+
+
+def _peek_frame():
+    """Current frame counter, or None if status.bin is unavailable."""
+    return _peek(_S_U32, 0)
+
+
+def _peek_player_state():
+    """Current player_state, or None if status.bin is unavailable."""
+    return _peek(_S_U32, 8)
+
+
+def _peek_has_player():
+    """has_player byte, or None if status.bin (or its v2 block) is unavailable."""
+    return _peek(_S_U8, 39)
+
+
+# read_status() key → (Struct, offset), for peeking any one field by name
+_STATUS_FIELDS = {
+    'frame': (_S_U32, 0), 'game_phase': (_S_U32, 4),
+    'player_state': (_S_U32, 8), 'powerup_id': (_S_U32, 12),
+    'pos_x': (_S_F32, 16), 'pos_y': (_S_F32, 20),
+    'vel_x': (_S_F32, 24), 'vel_y': (_S_F32, 28),
+    'state_frames': (_S_U32, 32), 'in_water': (_S_U8, 36),
+    'is_dead': (_S_U8, 37), 'is_goal': (_S_U8, 38), 'has_player': (_S_U8, 39),
+    'facing': (_S_F32, 40), 'gravity': (_S_F32, 44),
+    'buffered_action': (_S_U32, 48), 'input_polls': (_S_U32, 52),
+    'real_game_phase': (_S_I32, 56), 'course_theme': (_S_U8, 60),
+    'game_style': (_S_U32, 64),
+}
+_FIELD_PEEKS = {name: functools.partial(_peek, st, off)
+                for name, (st, off) in _STATUS_FIELDS.items()}
+
+
+# Last block read_status() decoded and its Status: polling faster than the
+# hook writes sees the same bytes again, which needs no second decode
+_last_block = None
+_last_status = None
 
 
 def read_status():
     """Read status.bin for real-time game state (updated every frame by hooks).
-    Supports both 32-byte (v1) and 64-byte (v2) status blocks."""
-    path = os.path.join(SD_BASE, "status.bin")
-    if not os.path.exists(path):
-        return None
-    with open(path, 'rb') as f:
-        data = f.read(68)
-    if len(data) < 32:
+    Supports both 32-byte (v1) and 64-byte (v2) status blocks. If every copy
+    taken is torn, the previous whole block's Status is returned (or None)."""
+    global _last_block, _last_status
+    for _ in range(_TORN_RETRIES):
+        data = _status_buffer(_STATUS_BLOCK_SIZE)
+        if data is None:
+            return None
+        # Decode a private copy, not the live mapping the hook writes into
+        data = data[:_STATUS_BLOCK_SIZE]
+        if not _is_torn(data):
+            break
+    else:
+        return _last_status  # every copy torn: keep the last whole block
+    if data != _last_block:
+        _last_block, _last_status = data, _decode_status(data)
+    return _last_status
+
+
+def status_history(n=_RING_SLOTS):
+    """The last n frames from status_ring.bin, oldest first, as Status
+    tuples. The hook writes each frame's block to slot frame % 64, so this
+    covers about a second of per-frame history without touching fields.csv.
+    Empty and torn slots are skipped; [] if the hook doesn't write the ring.
+    """
+    _sync_paths()
+    try:
+        fd = _open_ro(STATUS_RING_BIN)
+    except OSError:
+        return []
+    try:
+        data = os.pread(fd, _RING_SLOTS * _STATUS_BLOCK_SIZE, 0)
+    finally:
+        os.close(fd)
+    blocks = [data[i:i + _STATUS_BLOCK_SIZE]
+              for i in range(0, len(data) - _STATUS_BLOCK_SIZE + 1, _STATUS_BLOCK_SIZE)]
+    history = sorted((_decode_status(b) for b in blocks
+                      if not _is_torn(b) and _S_U32.unpack_from(b, 0)[0]),
+                     key=operator.attrgetter('frame'))
+    return history[-n:] if n else []
+
+
+def _is_torn(data):
+    """True if a full block's frame and frame_check differ (copied mid-write).
+    Shorter blocks and hooks that leave frame_check 0 can't be checked."""
+    if len(data) < _STATUS_BLOCK_SIZE:
+        return False
+    frame, check = _S_FRAME_CHECK.unpack_from(data, 0)
+    return check != 0 and check != frame
+
+
+class Status(collections.namedtuple("Status", (
+        'frame', 'game_phase', 'player_state', 'powerup_id',
+        'pos_x', 'pos_y', 'vel_x', 'vel_y',
+        # v2 (64-byte block)
+        'state_frames', 'in_water', 'is_dead', 'is_goal', 'has_player',
+        'facing', 'gravity', 'buffered_action', 'input_polls', 'real_game_phase',
+        # v3 (68-byte block)
+        'course_theme', 'game_style'))):
+    """One decoded status.bin block. Fields a shorter (older) block doesn't
+    have are None. Built straight from the unpacked tuple; s.frame is the
+    fast path, s['frame'] / s.get('frame') stay for dict-style callers."""
+    __slots__ = ()
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            try:
+                return getattr(self, key)
+            except AttributeError:
+                raise KeyError(key) from None
+        return tuple.__getitem__(self, key)
+
+    def get(self, key, default=None):
+        """Like dict.get: default when the field is missing from this block."""
+        v = getattr(self, key, None)
+        return default if v is None else v
+
+
+_PAD_V1 = (None,) * (len(Status._fields) - 8)
+_PAD_V2 = (None,) * 2
+
+
+def _decode_status(data):
+    """Decode a status.bin block (v1/v2/v3 by length) into a Status, or None."""
+    n = min(len(data), 68)
+    if n < 32:
         return None
-    frame, phase, state, powerup = struct.unpack_from('<IIII', data, 0)
-    pos_x, pos_y, vel_x, vel_y = struct.unpack_from('<ffff', data, 16)
-    result = {
-        'frame': frame, 'game_phase': phase,
-        'player_state': state, 'powerup_id': powerup,
-        'pos_x': pos_x, 'pos_y': pos_y,
-        'vel_x': vel_x, 'vel_y': vel_y,
-    }
-    # Extended v2 fields (64-byte block)
-    if len(data) >= 64:
-        state_frames, flags_byte = struct.unpack_from('<IB', data, 32)
-        in_water = flags_byte
-        is_dead, is_goal, has_player = struct.unpack_from('<BBB', data, 37)
-        facing, gravity, buffered, input_polls, real_phase = struct.unpack_from('<ffIIi', data, 40)
-        result.update({
-            'state_frames': state_frames,
-            'in_water': in_water,
-            'is_dead': is_dead,
-            'is_goal': is_goal,
-            'has_player': has_player,
-            'facing': facing,
-            'gravity': gravity,
-            'buffered_action': buffered,
-            'input_polls': input_polls,
-            'real_game_phase': real_phase,
-        })
-    # 68-byte block has theme (byte 60) and game_style (uint32 at 64)
-    if len(data) >= 68:
-        result['course_theme'] = data[60]
-        result['game_style'] = struct.unpack_from('<I', data, 64)[0]
-    return result
+    if n < 64:
+        return Status._make(_S_STATUS_V1.unpack_from(data, 0) + _PAD_V1)
+    if n < 68:
+        return Status._make(_S_STATUS_V2.unpack_from(data, 0) + _PAD_V2)
+    return Status._make(_S_STATUS_V3.unpack_from(data, 0))
+
+
+# Background sampler for long-running watchers: a daemon thread decodes
+# status.bin at 60 Hz into a single latest-snapshot slot, and readers take
+# that snapshot without any I/O. The thread preads through its own fd, so it
+# never touches the foreground mapping that read_status()/_peek() share.
+_sampler_thread = None
+_sampler_latest = None
+_sampler_seq = 0
+_sampler_tick = threading.Condition()
+_SAMPLER_HZ = 60
+
+
+def _sampler_loop(path):
+    global _sampler_latest, _sampler_seq
+    fd = None
+    period = 1.0 / _SAMPLER_HZ
+    next_t = time.monotonic()
+    while True:
+        # Reopen when status.bin is missing or was recreated (boot deletes it)
+        if fd is None or _sampler_seq % _SAMPLER_HZ == 0:
+            try:
+                ino = os.stat(path).st_ino
+                if fd is not None and os.fstat(fd).st_ino != ino:
+                    os.close(fd)
+                    fd = None
+                if fd is None:
+                    fd = _open_ro(path)
+            except OSError:
+                if fd is not None:
+                    os.close(fd)
+                fd = None
+        status = None
+        if fd is not None:
+            try:
+                data = os.pread(fd, _STATUS_BLOCK_SIZE, 0)
+                if _is_torn(data):
+                    data = os.pread(fd, _STATUS_BLOCK_SIZE, 0)
+                status = _decode_status(data)
+            except OSError:
+                os.close(fd)
+                fd = None
+        with _sampler_tick:
+            _sampler_latest = status
+            _sampler_seq += 1
+            _sampler_tick.notify_all()
+        next_t = max(next_t + period, time.monotonic())
+        time.sleep(next_t - time.monotonic())
+
+
+def latest_status(timeout_s=None):
+    """Latest status.bin snapshot from the background sampler (started on
+    first use, watching the current STATUS_BIN). With timeout_s, wait up to
+    that long for the next sample first. None if status.bin is unavailable."""
+    global _sampler_thread
+    if _sampler_thread is None:
+        _sync_paths()
+        _sampler_thread = threading.Thread(target=_sampler_loop, args=(STATUS_BIN,),
+                                           name="status-sampler", daemon=True)
+        _sampler_thread.start()
+        timeout_s = max(timeout_s or 0, 2.0 / _SAMPLER_HZ)
+    if timeout_s:
+        with _sampler_tick:
+            seq = _sampler_seq
+            _sampler_tick.wait_for(lambda: _sampler_seq != seq, timeout_s)
+    return _sampler_latest
+
+
+# fields.csv header, keyed on (path, inode) so a recreated log re-reads it
+_fields_header = None
+_fields_header_key = None
 
 
 def read_fields_csv():
     """Read latest line from fields.csv for game state."""
-    path = os.path.join(SD_BASE, "fields.csv")
-    if not os.path.exists(path):
+    global _fields_header, _fields_header_key
+    _sync_paths()
+    path = FIELDS_CSV
+    try:
+        fd = _open_ro(path)
+    except OSError:
         return None
-    with open(path, 'r') as f:
-        lines = f.readlines()
-    if len(lines) < 2:
+    # fields.csv grows by a row per frame: parse the header once, then read
+    # only the last few KB instead of the whole file.
+    try:
+        st = os.fstat(fd)
+        if _fields_header_key != (path, st.st_ino):
+            first = os.pread(fd, 4096, 0).split(b'\n', 1)[0]
+            _fields_header = first.decode().strip().split(',')
+            _fields_header_key = (path, st.st_ino)
+        start = max(0, st.st_size - 4096)
+        tail = os.pread(fd, st.st_size - start, start)
+    finally:
+        os.close(fd)
+    # The hook may be mid-row: only trust lines that end in a newline. Scan
+    # back from the end for the last complete row rather than splitting the
+    # whole window; no newline before it means we only have the header.
+    end = tail.rfind(b'\n')
+    prev = tail.rfind(b'\n', 0, end)
+    if prev < 0:
         return None
-    last = lines[-1].strip().split(',')
-    header = lines[0].strip().split(',')
-    return dict(zip(header, last))
+    last = tail[prev + 1:end].decode().strip().split(',')
+    return dict(zip(_fields_header, last))
+
+
+# Adaptive polling: seconds-until-change observed per status field. Waits
+# poll faster (down to a frame) where past transitions happened, and never
+# slower than the caller's interval: inotify doesn't fire for status.bin on a
+# drvfs path written from Windows, so the interval is the worst-case latency.
+_poll_history = {}
+_POLL_HISTORY_LEN = 32
+_POLL_MIN_S = 1 / 60    # one game frame
+
+
+def _record_poll(field, elapsed):
+    """Remember how long a wait on `field` took to succeed (seconds)."""
+    hist = _poll_history.setdefault(field, [])
+    hist.append(max(elapsed, _POLL_MIN_S))
+    del hist[:-_POLL_HISTORY_LEN]
+
+
+def _poll_schedule(field, timeout_s, interval):
+    """Yield poll offsets (seconds from the start of a wait) up to timeout_s.
+
+    With fewer than 3 observations for `field` this is a fixed `interval`.
+    Otherwise a lognormal p(t) is fitted to the history: the first poll after
+    the initial read goes at its 5th percentile, then each next poll follows
+    L_i = L_{i-1} + (F(L_{i-1}) - F(L_{i-2})) / p(L_{i-1}). Every gap is
+    clamped to one frame .. `interval`, so history only ever adds polls. The
+    last poll is always at timeout_s.
+    """
+    hist = _poll_history.get(field, ())
+    if len(hist) < 3:
+        t = 0.0
+        while t < timeout_s:
+            yield t
+            t += interval
+        yield timeout_s
+        return
+
+    import statistics           # only needed once a field has history
+    logs = [math.log(t) for t in hist]
+    dist = statistics.NormalDist(statistics.fmean(logs),
+                                 max(statistics.pstdev(logs), 0.1))
+    cdf = lambda t: dist.cdf(math.log(t)) if t > 0 else 0.0
+    pdf = lambda t: dist.pdf(math.log(t)) / t if t > 0 else 0.0
+
+    yield 0.0
+    clamp = lambda step: min(max(step, _POLL_MIN_S), interval)
+    prev, cur = 0.0, clamp(math.exp(dist.inv_cdf(0.05)))
+    while cur < timeout_s:
+        yield cur
+        p, mass = pdf(cur), cdf(cur) - cdf(prev)
+        step = mass / p if p > 0 and mass > 0 else interval
+        prev, cur = cur, cur + clamp(step)
+    yield timeout_s
+
+
+def _wait_status_event(timeout_s, directory=None):
+    """Block up to timeout_s for status.bin (in `directory`, default SD_BASE)
+    to change. True if it changed, False on timeout (see statuswatch)."""
+    return statuswatch.wait_status_event(timeout_s, directory or SD_BASE)
+
+
+def _poll_until(predicate, field, timeout_s, interval=0.1, peek=None):
+    """Read status.bin on the adaptive schedule for `field` until
+    predicate(status) is true. Returns the status dict, or None on timeout.
+
+    Between scheduled polls the wait also wakes on inotify events for
+    status.bin, so a change is usually seen within a frame.
+
+    If `peek` is given, predicate is applied to peek() (a single raw field)
+    and the full status dict is only decoded once it matches.
+    """
+    start = time.monotonic()
+    for offset in _poll_schedule(field, timeout_s, interval):
+        delay = start + offset - time.monotonic()
+        while delay > 0 and _wait_status_event(delay):
+            v = peek() if peek else read_status()
+            if v is not None and predicate(v):
+                break
+            delay = start + offset - time.monotonic()
+        else:
+            v = peek() if peek else read_status()
+        if v is not None and predicate(v):
+            if offset > 0:
+                _record_poll(field, time.monotonic() - start)
+            return read_status() if peek else v
+    return None
 
 
 def wait_for_state(target_state, timeout_ms=10000):
     """Poll status.bin until player reaches target state."""
-    deadline = time.time() + timeout_ms / 1000.0
-    while time.time() < deadline:
-        s = read_status()
-        if s and s['player_state'] == target_state:
-            return s
-        time.sleep(0.05)  # 50ms poll
-    return None
+    return _poll_until(lambda st: st == target_state, 'player_state',
+                       timeout_ms / 1000.0, interval=0.05, peek=_peek_player_state)
 
 
 def wait_for_frame_advance(timeout_s=10, start_frame=None):
     """Wait until status.bin frame counter advances (proves game is running).
     Returns the status dict, or None on timeout."""
     if start_frame is None:
-        s = read_status()
-        start_frame = s['frame'] if s else 0
-    deadline = time.time() + timeout_s
-    while time.time() < deadline:
-        s = read_status()
-        if s and s['frame'] > start_frame:
-            return s
-        time.sleep(0.1)
-    return None
+        start_frame = _peek_frame() or 0
+    return _poll_until(lambda f: f > start_frame, 'frame', timeout_s,
+                       peek=_peek_frame)
 
 
 def wait_for_has_player(timeout_s=10):
     """Wait until has_player becomes 1 in status.bin."""
-    deadline = time.time() + timeout_s
-    while time.time() < deadline:
-        s = read_status()
-        if s and s.get('has_player'):
-            return s
-        time.sleep(0.1)
-    return None
+    return _poll_until(bool, 'has_player', timeout_s, peek=_peek_has_player)
 
 
 def wait_for_change(field, timeout_s=10, initial=None):
     """Wait until a specific status field changes from its initial value.
     If initial is None, reads current value first.
-    Returns the new status dict, or None on timeout."""
+    Returns the new status dict, or None on timeout.
+
+    Status fields are peeked straight from status.bin; any other name falls
+    back to read_status().get(field) on each poll."""
+    peek = _FIELD_PEEKS.get(field)
+    if peek is None:
+        def peek():
+            s = read_status()
+            return s.get(field) if s else None
     if initial is None:
-        s = read_status()
-        initial = s.get(field) if s else None
-    deadline = time.time() + timeout_s
-    while time.time() < deadline:
-        s = read_status()
-        if s and s.get(field) != initial:
+        initial = peek()
+    return _poll_until(lambda v: v != initial, field, timeout_s, peek=peek)
+
+
+def _press_until(buttons, field, initial, attempts=3, per_attempt_timeout_s=1.5,
+                 hold_ms=100):
+    """Press buttons, then wait for status `field` to leave `initial`;
+    re-press only if it didn't within per_attempt_timeout_s.
+    Returns the changed status dict, or None after all attempts."""
+    for _ in range(attempts):
+        hold(buttons, hold_ms)
+        s = wait_for_change(field, timeout_s=per_attempt_timeout_s, initial=initial)
+        if s:
             return s
-        time.sleep(0.1)
     return None
 
 
 def is_fresh(timeout_s=0.2):
     """Check if status.bin is being updated (not stale).
-    Returns True if frame advances within timeout."""
-    s1 = read_status()
-    if not s1:
+    Returns True as soon as the frame advances, False if it doesn't within timeout."""
+    f1 = _peek_frame()
+    if f1 is None:
         return False
-    time.sleep(timeout_s)
-    s2 = read_status()
-    return s2 is not None and s2['frame'] > s1['frame']
+    return _poll_until(lambda f: f > f1, 'frame', timeout_s, interval=0.005,
+                       peek=_peek_frame) is not None
 
 
 def is_playing():
     """Check if we're in gameplay (player state != 0)."""
-    s = read_status()
-    return s and s['player_state'] != 0
+    state = _peek_player_state()
+    return state is not None and state != 0
+
+
+# Ready gates for input that ends in a level/editor load: (peek, predicate).
+# The sequence's final settle wait becomes the gate's timeout, so a fast load
+# moves on as soon as status.bin shows it and a slow one waits as before.
+# Menu-bound input stays blind — status.bin has no "menu is responsive" signal.
+# Editor-bound input gates on state 43, not has_player: the title screen's
+# cosmetic Mario already sets has_player.
+_GATE_HAS_PLAYER = (_peek_has_player, bool)
+_GATE_IN_EDITOR = (_peek_player_state, lambda st: st == 43)
+_GATE_LEFT_EDITOR = (_peek_player_state, lambda st: st != 43)
+_GATE_FLOOR_MS = 300    # after the gate: frames can update before input is taken
+
+
+def _play_gated(steps, gate, label):
+    """Play steps, but end on the gate instead of the final settle wait.
+    Returns True if the gate was met, False if the settle time ran out."""
+    peek, ready = gate
+    # Release, then wait for the load instead of the settle time
+    sequence(steps[:-1] + [(0, 0)])
+    if not _poll_until(ready, label, steps[-1][1] / 1000.0, interval=0.05, peek=peek):
+        return False
+    wait(_GATE_FLOOR_MS)
+    return True
 
 
 # ============================================================
@@ -314,10 +1138,12 @@ def is_playing():
 
 def title_skip():
     """Skip title screen with L+R (bumpers) → main menu with Make/Play."""
-    print("Title skip (L+R)...")
-    hold("L,R", 500)
-    time.sleep(1)
-    print("At main menu (Make/Play)")
+    log.info("Title skip (L+R)...")
+    # One input.bin write; the hook plays it on its input polls
+    if not play_queued([(Btn.L | Btn.R, 500), (0, 1000)]):
+        log.warning("Title skip didn't finish playing; queue cancelled")
+        return
+    log.info("At main menu (Make/Play)")
 
 
 def course_maker():
@@ -325,36 +1151,34 @@ def course_maker():
     TODO: This needs screenshot-based navigation since menu layout varies.
     For now, assumes we're at the main menu.
     """
-    print("Navigating to Course Maker...")
+    log.info("Navigating to Course Maker...")
     # Main menu: Course Maker is typically the middle-right option
     # This sequence may need adjustment based on menu state
-    press("A", 100)  # Select
-    wait(3000)        # Loading
-    print("Done — check screenshot to verify")
+    # Select, then up to 3 s loading — done as soon as the editor is up
+    _play_gated([(Btn.A, 100), (0, 3000)], _GATE_IN_EDITOR, 'course_maker')
+    log.info("Done — check screenshot to verify")
 
 
 def enter_play():
     """Enter play mode from editor (plays in place, Mario stays where he is)."""
-    print("Entering play mode (in place)...")
-    press("MINUS", 100)
-    wait(3000)
-    print("In play mode")
+    log.info("Entering play mode (in place)...")
+    _play_gated([(Btn.MINUS, 100), (0, 3000)], _GATE_LEFT_EDITOR, 'enter_play')
+    log.info("In play mode")
 
 
 def enter_play_reset():
     """Enter play mode from editor with Mario reset to start position."""
-    print("Entering play mode (reset to start)...")
-    hold("MINUS", 1500)  # Long press = reset + play
-    wait(3000)
-    print("In play mode (from start)")
+    log.info("Entering play mode (reset to start)...")
+    # Long press = reset + play
+    _play_gated([(Btn.MINUS, 1500), (0, 3000)], _GATE_LEFT_EDITOR, 'enter_play')
+    log.info("In play mode (from start)")
 
 
 def enter_make():
     """Enter editor mode from play."""
-    print("Entering editor mode...")
-    press("MINUS", 100)
-    wait(1000)
-    print("In editor mode")
+    log.info("Entering editor mode...")
+    _play_gated([(Btn.MINUS, 100), (0, 1000)], _GATE_IN_EDITOR, 'enter_make')
+    log.info("In editor mode")
 
 
 def wait_for_scene(target_scene, timeout_s=15):
@@ -369,29 +1193,54 @@ def wait_for_scene(target_scene, timeout_s=15):
 
 
 def wait_for_player(timeout_s=10):
-    """Wait until has_player becomes true in status.bin."""
-    deadline = time.time() + timeout_s
-    while time.time() < deadline:
-        s = read_status()
-        if s and s.get('has_player'):
-            return s
-        time.sleep(0.2)
-    return None
+    """Wait until has_player becomes true in status.bin.
+
+    Wakes on inotify events; where they aren't delivered (status.bin on a
+    drvfs /mnt/c path written from Windows) polls are at most 20 ms apart,
+    however much has_player history _poll_schedule() has gathered.
+    """
+    return _poll_until(bool, 'has_player', timeout_s, interval=0.02,
+                       peek=_peek_has_player)
+
+
+# From Course Maker: B, B to exit, then A to confirm the exit dialog (if any)
+_EDITOR_EXIT_TO_MENU = [(Btn.B, 100), (0, 500), (Btn.B, 100), (0, 500), (Btn.A, 100), (0, 3000)]
 
 
 def navigate_to_main_menu():
     """From Course Maker (scene 4), go to main menu (scene 2).
     Press B to exit editor, then confirm."""
-    print("Navigating to main menu...")
-    # From Course Maker: press B to exit
-    press("B", 100)
-    wait(500)
-    press("B", 100)
-    wait(500)
-    # Confirm exit dialog (if any) — press A
-    press("A", 100)
-    wait(3000)
-    print("Should be at main menu now")
+    log.info("Navigating to main menu...")
+    sequence(_EDITOR_EXIT_TO_MENU)
+    log.info("Should be at main menu now")
+
+
+def _kill_by_comm(name):
+    """SIGTERM every process whose /proc/<pid>/comm is exactly name (pkill -x).
+    comm is truncated to 15 chars by the kernel, so name must fit."""
+    for pid in os.listdir('/proc'):
+        if not pid.isdigit():
+            continue
+        try:
+            with open(f'/proc/{pid}/comm') as f:
+                if f.read().rstrip('\n') != name:
+                    continue
+            os.kill(int(pid), signal.SIGTERM)
+        except OSError:
+            pass
+
+
+def _wait_gdb_pane(pattern, timeout_s=5, interval=0.05):
+    """Poll the eden-gdb tmux pane until pattern shows up. Returns True if seen."""
+    deadline = time.perf_counter() + timeout_s
+    while True:
+        r = subprocess.run(["tmux", "capture-pane", "-p", "-t", "eden-gdb"],
+                           capture_output=True, text=True)
+        if pattern in r.stdout:
+            return True
+        if time.perf_counter() >= deadline:
+            return False
+        time.sleep(interval)
 
 
 def boot(target="play"):
@@ -408,73 +1257,64 @@ def boot(target="play"):
     Args:
         target: "play", "editor", or "menu"
     """
-    import subprocess
-    
     emu = "eden" if _use_eden else "ryujinx"
-    tools_dir = os.path.dirname(os.path.abspath(__file__))
-    emu_script = os.path.join(tools_dir, "emu_session.py")
     
     # Step 1: Check if emulator is already running (fast PID check)
-    # Import emu_session for direct PID check instead of subprocess
-    sys.path.insert(0, tools_dir)
+    # emu_session is imported and called in-process for both the check and
+    # the launch (no second Python interpreter)
+    sys.path.insert(0, _TOOLS_DIR)
     import emu_session
     already_running = emu_session.is_running(emu)
     
     use_gdb = _use_eden and not _no_gdb
     
+    # Stale GDB cleanup does not depend on the emulator, so it runs while
+    # cmd_launch is still waiting for the process to appear
+    gdb_cleanup = None
+    if use_gdb:
+        _kill_by_comm("gdb-multiarch")
+        gdb_cleanup = subprocess.Popen(["tmux", "kill-session", "-t", "eden-gdb"],
+                                       stderr=subprocess.DEVNULL)
+    
     if not already_running:
-        print(f"Launching {emu}...")
-        gdb_flag = ["--gdb"] if use_gdb else ["--no-gdb"]
-        subprocess.run([sys.executable, emu_script, "launch", emu] + gdb_flag,
-                      timeout=30)
+        log.info("Launching %s...", emu)
+        emu_session.cmd_launch(emu, gdb=use_gdb)
     else:
-        print(f"{emu} already running")
+        log.info("%s already running", emu)
     
     # Step 2: For Eden with GDB, connect and continue immediately
     # Eden PAUSES on start until GDB connects — do NOT wait!
     if use_gdb:
-        print("Connecting GDB (Eden pauses until GDB continues)...")
-        # Kill any existing GDB sessions
-        subprocess.run(["pkill", "-f", "gdb-multiarch"], capture_output=True)
-        subprocess.run(["tmux", "kill-session", "-t", "eden-gdb"],
-                      capture_output=True)
-        time.sleep(0.5)
-        
-        # Create persistent GDB session
-        subprocess.run(["tmux", "new-session", "-d", "-s", "eden-gdb"])
-        time.sleep(0.5)
-        subprocess.run(["tmux", "send-keys", "-t", "eden-gdb",
-                       "gdb-multiarch -q", "Enter"])
-        time.sleep(2)
-        
+        log.info("Connecting GDB (Eden pauses until GDB continues)...")
+        # The session's gdb connects and continues on its own (no send-keys
+        # + sleep chain).
         gdb_host = os.environ.get("EDEN_GDB_HOST", "172.19.32.1")
         gdb_port = os.environ.get("EDEN_GDB_PORT", "6543")
-        subprocess.run(["tmux", "send-keys", "-t", "eden-gdb",
-                       f"target remote {gdb_host}:{gdb_port}", "Enter"])
-        time.sleep(3)
-        subprocess.run(["tmux", "send-keys", "-t", "eden-gdb", "c", "Enter"])
-        time.sleep(1)
-        print("GDB connected and continued")
+        gdb_cmd = "gdb-multiarch -q -ex {} -ex c".format(
+            shlex.quote(f"target remote {gdb_host}:{gdb_port}"))
+        gdb_cleanup.wait()
+        subprocess.run(["tmux", "new-session", "-d", "-s", "eden-gdb", gdb_cmd], check=False)
+        if _wait_gdb_pane("Continuing.", timeout_s=5):
+            log.info("GDB session started (target remote + continue)")
+        else:
+            log.warning("  WARNING: GDB did not report 'Continuing.' (check: tmux attach -t eden-gdb)")
     
     # Step 3: Clear stale status.bin and wait for game to start
-    status_path = os.path.join(SD_BASE, "status.bin")
-    if os.path.exists(status_path):
-        os.remove(status_path)
+    _sync_paths()
+    try:
+        os.remove(STATUS_BIN)
+    except FileNotFoundError:
+        pass
+    _close_status_fd()
     
-    print("Waiting for game to start...")
+    log.info("Waiting for game to start...")
     # Poll until status.bin appears and frame > 0
-    deadline = time.time() + 20
-    s = None
-    while time.time() < deadline:
-        s = read_status()
-        if s and s['frame'] > 0:
-            break
-        time.sleep(0.5)
+    s = _poll_until(lambda s: s.frame > 0, 'boot_frame', 20, interval=0.5)
     
-    if not s or s['frame'] == 0:
-        print("ERROR: Game not responding (no status.bin or frame=0)")
+    if not s:
+        log.error("ERROR: Game not responding (no status.bin or frame=0)")
         return False
-    print(f"  Game running at frame {s['frame']}")
+    log.info("  Game running at frame %s", s.frame)
     
     # Step 4: Title screen → Main Menu
     # Title screen shows a playable demo level with a real PlayerObject.
@@ -483,87 +1323,70 @@ def boot(target="play"):
     # Demo Mario persists in background — no state/has_player change.
     # IMPORTANT: Wait for title animation to finish before L+R will be accepted.
     # The "Press L + R" prompt appears after ~3-5 seconds.
-    print("Waiting for title screen to be ready...")
-    deadline = time.time() + 8
-    while time.time() < deadline:
-        s = read_status()
-        if s and s.get('has_player') and s['frame'] > 120:  # ~2 seconds at 60fps
-            break
-        time.sleep(0.3)
+    log.info("Waiting for title screen to be ready...")
+    _poll_until(lambda s: s.get('has_player') and s.frame > 120,  # ~2 seconds at 60fps
+                'title_ready', 8, interval=0.3)
     
-    print("Title skip (L+R)...")
-    # L+R may need to be sent multiple times if title animation is still playing
-    for attempt in range(3):
-        hold("L,R", 500)
-        time.sleep(1.5)
-        # Check if something changed (e.g., phase shifted)
-        s = read_status()
-        if s and s.get('real_game_phase', 0) != s.get('game_phase', 0):
-            break  # Phase changed = menu appeared
+    log.info("Title skip (L+R)...")
+    # L+R may need to be sent multiple times if title animation is still playing;
+    # a phase change means the menu appeared.
+    s = read_status()
+    _press_until(Btn.L | Btn.R, 'real_game_phase', s.get('real_game_phase') if s else None,
+                 hold_ms=500)
     # Give menu animation time to settle
     time.sleep(1)
     
     if target == "menu":
         _save_state(STATE_MAIN_MENU)
-        print("✅ At main menu (Make/Play)")
+        log.info("✅ At main menu (Make/Play)")
         return True
     
     # Step 5: Main Menu → Course Maker Editor
     # "Make" is default tab-indexed button. Single A press.
     # This triggers a scene transition (loading screen).
-    print("Entering Course Maker (A)...")
-    f_before = read_status()['frame'] if read_status() else 0
-    press("A", 100)
+    log.info("Entering Course Maker (A)...")
+    press(Btn.A, 100)
     
     # Wait for scene transition: A press causes loading screen.
     # During loading: has_player may go 0, phase changes.
     # Editor loads with a new PlayerObject.
     # Simple approach: wait for has_player=0 (loading started), then has_player=1 (loaded).
-    deadline = time.time() + 5
-    while time.time() < deadline:
-        s = read_status()
-        if s and not s.get('has_player'):
-            break
-        time.sleep(0.2)
+    wait_for_change('has_player', timeout_s=5, initial=True)
+    s = wait_for_change('has_player', timeout_s=10, initial=False)
     
-    # Now wait for editor to finish loading (has_player returns)
-    deadline = time.time() + 10
-    in_editor = False
-    while time.time() < deadline:
-        s = read_status()
-        if s and s.get('has_player'):
-            in_editor = True
-            break
-        time.sleep(0.3)
-    
-    if in_editor:
+    if s:
         _save_state(STATE_EDITOR)
-        print(f"  In editor: frame={s['frame']}")
+        log.info("  In editor: frame=%s", s.frame)
     else:
         _save_state(STATE_EDITOR)
-        print("  WARNING: Could not confirm editor (continuing)")
+        log.warning("  WARNING: Could not confirm editor (continuing)")
     
     if target == "editor":
-        print("✅ In editor")
+        log.info("✅ In editor")
         return True
     
     # Step 6: Editor → Play mode
     # Single MINUS press (not hold!) toggles to play mode.
-    print("Entering play mode (MINUS)...")
-    press("MINUS", 100)
-    time.sleep(2)  # Wait for play mode transition
+    log.info("Entering play mode (MINUS)...")
+    editor_state = s.player_state if s else None
+    press(Btn.MINUS, 100)
+    s = wait_for_change('player_state', timeout_s=3, initial=editor_state) or read_status()
     
-    s = read_status()
     if s and s.get('has_player'):
         _save_state(STATE_PLAYING)
-        print(f"✅ Playing: state={s['player_state']}, pos=({s['pos_x']:.0f}, {s['pos_y']:.0f})")
+        log.info("✅ Playing: state=%s, pos=(%.0f, %.0f)", s.player_state, s.pos_x, s.pos_y)
     else:
         _save_state(STATE_PLAYING)
-        print("  WARNING: Could not confirm play state")
+        log.warning("  WARNING: Could not confirm play state")
     
     return True
 
 
+# From main menu — Coursebot is typically accessed via DOWN; A enters it
+_MENU_DOWN_TO_COURSEBOT = [(Btn.DOWN, 100), (0, 300), (Btn.DOWN, 100), (0, 300),
+                           (Btn.A, 100), (0, 3000)]
+
+
 def navigate_to_coursebot():
     """From main menu (scene 2), navigate to Coursebot.
     Main menu layout (top to bottom, roughly):
@@ -574,15 +1397,17 @@ def navigate_to_coursebot():
     
     From Course Maker selection, press DOWN then RIGHT to reach Coursebot,
     then A to enter."""
-    print("Navigating to Coursebot...")
-    # From main menu — Coursebot is typically accessed via DOWN
-    press("DOWN", 100)
-    wait(300)
-    press("DOWN", 100)
-    wait(300)
-    press("A", 100)  # Enter Coursebot
-    wait(3000)  # Wait for Coursebot to load
-    print("Should be in Coursebot now")
+    log.info("Navigating to Coursebot...")
+    # No waits in the middle, so the hook plays the taps on its input polls
+    if not play_queued(_MENU_DOWN_TO_COURSEBOT):
+        log.warning("Coursebot taps didn't finish playing; queue cancelled")
+        return
+    log.info("Should be in Coursebot now")
+
+
+# In Coursebot "My Courses" the most recently edited course is near the top:
+# A selects the first course, A again on the detail screen presses Play
+_COURSEBOT_PLAY_FIRST = [(Btn.A, 100), (0, 1000), (Btn.A, 100), (0, 3000)]
 
 
 def coursebot_load_test_level():
@@ -595,16 +1420,55 @@ def coursebot_load_test_level():
     
     For now: navigate to the last page and look for it.
     TODO: use screenshot to find the exact position."""
-    print("Loading test level from Coursebot...")
-    # In Coursebot "My Courses" tab, courses are displayed in a grid
-    # The most recently edited course should be near the top
-    # Just press A on the first course to select it, then Play
-    press("A", 100)  # Select first course
-    wait(1000)
-    # Course detail screen — "Play" button should be available
-    press("A", 100)  # Press Play
-    wait(3000)  # Wait for level to load
-    print("Level should be loading...")
+    log.info("Loading test level from Coursebot...")
+    _play_gated(_COURSEBOT_PLAY_FIRST, _GATE_HAS_PLAYER, 'coursebot_load')
+    log.info("Level should be loading...")
+
+
+# Title → PLUS (main menu) → A (coursebot) → A (select) → A (load) → hold MINUS (play)
+_TITLE_TO_TEST_LEVEL = [
+    (Btn.L | Btn.R, 200), (0, 4000),
+    (Btn.PLUS, 100), (0, 3000),
+    (Btn.A, 100), (0, 4000),
+    (Btn.A, 100), (0, 1500),
+    (Btn.A, 100), (0, 4000),
+    (Btn.MINUS, 1500), (0, 3000),
+]
+_HOLD_MINUS_TO_PLAY = [(Btn.MINUS, 1500), (0, 3000)]
+
+# full_load_test_level(): situation → (message, input sequence)
+_LOAD_ACTIONS = {
+    'editor':    ("  In editor mode — entering play...", _HOLD_MINUS_TO_PLAY),
+    'title':     ("  Title screen — full navigation...", _TITLE_TO_TEST_LEVEL),
+    'no_player': ("  In Course Maker but no player — trying to enter play...", _HOLD_MINUS_TO_PLAY),
+    'other':     ("  Phase {phase} — attempting full navigation...", _TITLE_TO_TEST_LEVEL),
+}
+# Shared by every loading wait in one full_load_test_level() call; the
+# input sequence played afterwards has its own play_queued() timeout
+_LOAD_BUDGET_S = 60
+
+
+def _load_situation(phase, has_player, state):
+    """Classify (real_game_phase, has_player, player_state) for full_load_test_level()."""
+    if phase == 3 and has_player:
+        if state == 43:
+            return 'editor'
+        if state != 0:
+            return 'playing'
+    if phase == 0 or phase == -99:
+        return 'title'
+    if phase == 3 and not has_player:
+        return 'no_player'
+    if phase == -1:
+        return 'loading'
+    return 'other'
+
+
+def _wait_for_load(timeout_s=30):
+    """Wait for real_game_phase to leave -1. Returns the new phase, or None."""
+    s = _poll_until(lambda phase: phase != -1, 'real_game_phase', timeout_s,
+                    interval=0.25, peek=_FIELD_PEEKS['real_game_phase'])
+    return s.real_game_phase if s else None
 
 
 def full_load_test_level():
@@ -614,110 +1478,66 @@ def full_load_test_level():
     - Title screen (phase 0) → full navigation: L+R, A, RIGHT, A, A, A, hold MINUS
     - Course Maker (phase 3) with player → already in level, just hold MINUS to play
     - Course Maker (phase 3) no player → need to load from coursebot
-    - Loading (phase -1) → wait
+    - Loading (phase -1) → wait, then re-detect
     
     The test level should be the first course in Coursebot "My Courses".
     """
-    print("=== Smart level loader ===")
+    log.info("=== Smart level loader ===")
     
-    s = read_status()
-    phase = s.get('real_game_phase', -99) if s else -99
-    has_player = s.get('has_player', False) if s else False
-    state = s.get('player_state', 0) if s else 0
-    
-    print(f"  Current: phase={phase} player={has_player} state={state}")
-    
-    # Already in Course Maker with player in play mode?
-    if phase == 3 and has_player and state not in (0, 43):
-        print("  Already playing in Course Maker! Nothing to do.")
-        print(f"=== Ready! Player at ({s['pos_x']:.0f}, {s['pos_y']:.0f}) state={state} ===")
-        return
-    
-    # In Course Maker editor mode (state 43) — just play
-    if phase == 3 and has_player and state == 43:
-        print("  In editor mode — entering play...")
-        hold("MINUS", 1500)
-        wait(3000)
+    t_stop = time.monotonic() + _LOAD_BUDGET_S
+    while True:
         s = read_status()
-        if s and s.get('has_player'):
-            print(f"=== Ready! Player at ({s['pos_x']:.0f}, {s['pos_y']:.0f}) state={s['player_state']} ===")
-        return
-    
-    # Title screen (phase 0) or unknown — full navigation
-    # Sequence: L+R (dismiss title) → PLUS (main menu) → A (coursebot) → A (select) → A (load) → hold MINUS (play)
-    if phase == 0 or phase == -99:
-        print("  Title screen — full navigation...")
-        press("L,R", 200)
-        wait(4000)
-        press("PLUS", 100)
-        wait(3000)
-        press("A", 100)
-        wait(4000)
-        press("A", 100)
-        wait(1500)
-        press("A", 100)
-        wait(4000)
-        hold("MINUS", 1500)
-        wait(3000)
-    
-    # Phase 3 but no player — in Course Maker without a level?
-    elif phase == 3 and not has_player:
-        print("  In Course Maker but no player — trying to enter play...")
-        hold("MINUS", 1500)
-        wait(3000)
-    
-    # Loading — wait for a real phase
-    elif phase == -1:
-        print("  Loading... waiting for game to finish booting...")
-        for _ in range(30):  # up to 30s
-            wait(1000)
-            s = read_status()
-            phase = s.get('real_game_phase', -1) if s else -1
-            if phase != -1:
-                print(f"  Game loaded! Phase={phase} — restarting navigation...")
-                return full_load_test_level()  # recurse with new state
-        print("  Timed out waiting for game to load")
-        return
-    
-    else:
-        print(f"  Phase {phase} — attempting full navigation...")
-        press("L,R", 200)
-        wait(4000)
-        press("PLUS", 100)
-        wait(3000)
-        press("A", 100)
-        wait(4000)
-        press("A", 100)
-        wait(1500)
-        press("A", 100)
-        wait(4000)
-        hold("MINUS", 1500)
-        wait(3000)
+        phase = s.get('real_game_phase', -99) if s else -99
+        has_player = s.get('has_player', False) if s else False
+        state = s.get('player_state', 0) if s else 0
+        log.info("  Current: phase=%s player=%s state=%s", phase, has_player, state)
+
+        situation = _load_situation(phase, has_player, state)
+        if situation == 'playing':
+            log.info("  Already playing in Course Maker! Nothing to do.")
+            log.info("=== Ready! Player at (%.0f, %.0f) state=%s ===", s.pos_x, s.pos_y, state)
+            return
+        if situation == 'loading':
+            log.info("  Loading... waiting for game to finish booting...")
+            phase = _wait_for_load(t_stop - time.monotonic())
+            if phase is None:
+                log.warning("  Timed out waiting for game to load (%ds budget)", _LOAD_BUDGET_S)
+                return
+            log.info("  Game loaded! Phase=%s — restarting navigation...", phase)
+            continue
+
+        message, steps = _LOAD_ACTIONS[situation]
+        log.info(message.format(phase=phase))
+        # One input.bin write; the hook plays it on its input polls
+        if not play_queued(steps):
+            log.warning("=== Input didn't finish playing; queue cancelled ===")
+            return
+        break
     
     s = read_status()
     if s and s.get('has_player'):
-        print(f"=== Ready! Player at ({s['pos_x']:.0f}, {s['pos_y']:.0f}) state={s['player_state']} ===")
+        log.info("=== Ready! Player at (%.0f, %.0f) state=%s ===", s.pos_x, s.pos_y, s.player_state)
     else:
-        print("=== Navigation may have failed — check screenshot ===")
+        log.warning("=== Navigation may have failed — check screenshot ===")
 
 
 def reset_level():
     """Long-press rocket to reset entire level."""
-    print("Resetting level (long-press rocket)...")
+    log.info("Resetting level (long-press rocket)...")
     # Rocket is a UI element — need touch input or specific button combo
     # For now: PLUS opens pause, then navigate to reset?
     # Actually, in editor mode the rocket is clickable via touch
     # TODO: find the actual button shortcut for reset
-    print("TODO: need to figure out button shortcut for rocket reset")
-    print("For now, use screenshot + click approach")
+    log.info("TODO: need to figure out button shortcut for rocket reset")
+    log.info("For now, use screenshot + click approach")
 
 
 def reposition_mario():
     """Long-press start to reposition Mario at cursor."""
-    print("Repositioning Mario (long-press PLUS)...")
-    hold("PLUS", 1500)  # Long press
+    log.info("Repositioning Mario (long-press PLUS)...")
+    hold(Btn.PLUS, 1500)  # Long press
     wait(500)
-    print("Mario repositioned")
+    log.info("Mario repositioned")
 
 
 # ============================================================
@@ -738,20 +1558,66 @@ STATE_COURSEBOT = "coursebot"    # Coursebot course list (scene 4, sub: coursebo
 STATE_PAUSE = "pause"           # Pause menu during play
 STATE_LOADING = "loading"       # Loading screen (scene -1)
 
-# Persistent state file — written after every navigation action
-_STATE_FILE = os.path.join(SD_BASE, "nav_state.txt")
+# (path, state) — only we write the file, so the last value we saw is current.
+# Saves only update this cell; the file is written once, atomically, when
+# the process exits (or when the path changes), not on every navigation hop.
+_state_cache = None
+_state_dirty = False
+# With --invalidate-state-cache, the (path, inode, mtime_ns) the cached state
+# was read at: a stat that still matches means no other process replaced it
+_state_stat = None
+
+def _flush_state():
+    """Write a pending _save_state() to disk via tmp file + rename."""
+    global _state_dirty
+    if not _state_dirty:
+        return
+    _state_dirty = False
+    path, state = _state_cache
+    try:
+        with open(path + ".tmp", 'w') as f:
+            f.write(state)
+        os.replace(path + ".tmp", path)
+    except OSError as e:
+        print(f"Warning: could not save nav state to {path}: {e}")
+
+atexit.register(_flush_state)
 
 def _save_state(state):
-    """Persist our believed current state."""
-    with open(_STATE_FILE, 'w') as f:
-        f.write(state)
+    """Record our believed current state (skipped if unchanged)."""
+    global _state_cache, _state_dirty
+    _sync_paths()
+    if _state_cache == (_STATE_FILE, state) and not _no_state_cache:
+        return
+    if _state_cache and _state_cache[0] != _STATE_FILE:
+        _flush_state()
+    _state_cache = (_STATE_FILE, state)
+    _state_dirty = True
+    if _no_state_cache:
+        _flush_state()  # other processes read the file: write through
 
 def _load_state():
     """Load persisted state, or unknown."""
-    if os.path.exists(_STATE_FILE):
+    global _state_cache, _state_stat
+    _sync_paths()
+    if _state_cache and _state_cache[0] == _STATE_FILE and not _no_state_cache:
+        return _state_cache[1]
+    _flush_state()
+    try:
+        st = os.stat(_STATE_FILE)
+    except FileNotFoundError:
+        _state_cache, _state_stat = (_STATE_FILE, STATE_UNKNOWN), None
+        return STATE_UNKNOWN
+    key = (_STATE_FILE, st.st_ino, st.st_mtime_ns)
+    if key == _state_stat and _state_cache and _state_cache[0] == _STATE_FILE:
+        return _state_cache[1]
+    try:
         with open(_STATE_FILE, 'r') as f:
-            return f.read().strip()
-    return STATE_UNKNOWN
+            state = f.read().strip()
+    except FileNotFoundError:
+        state, key = STATE_UNKNOWN, None
+    _state_cache, _state_stat = (_STATE_FILE, state), key
+    return state
 
 def detect_state():
     """Detect game state from status.bin + nav_state.txt fallback.
@@ -762,361 +1628,421 @@ def detect_state():
     - real_game_phase -1 = loading
     - Distinguishes title vs play via nav_state.txt tracking
     """
-    status = read_status()
-    if status is None:
+    data = _status_buffer(_S_DETECT.size)
+    if data is None or len(data) < 32:
         return _load_state()  # no status.bin, use persisted state
     
-    # Check if game is running at all
-    if status.get('real_game_phase', -1) == -1:
+    # Check if game is running at all (v1 blocks have no real_game_phase)
+    if len(data) < _S_DETECT.size:
+        return STATE_UNKNOWN
+    player_state, has_player, real_phase = _S_DETECT.unpack_from(data, 0)
+    if real_phase == -1:
         return STATE_UNKNOWN  # loading
     
-    has_player = status.get('has_player', 0)
-    player_state = status.get('player_state', 0)
-    
-    if has_player:
-        # State 43 = editor idle (only appears in Course Maker editor)
-        if player_state == 43:
-            return STATE_EDITOR
-        # Any other state with a player = playing (or title cosmetic Mario)
-        # Use nav_state to disambiguate title vs play
-        persisted = _load_state()
-        if persisted in (STATE_PLAYING, STATE_EDITOR, STATE_PAUSE):
-            return persisted
-        # If we have a player but nav_state says title/unknown,
-        # it's likely the title screen cosmetic Mario
-        return persisted if persisted != STATE_UNKNOWN else STATE_TITLE
-    
-    # No player — could be main menu, coursebot, or between screens
-    return _load_state()
+    # State 43 = editor idle (only appears in Course Maker editor)
+    if has_player and player_state == 43:
+        return STATE_EDITOR
+    # Anything else is decided by nav_state: with a player it's playing (or
+    # the title screen's cosmetic Mario when nav_state knows nothing), with
+    # none it's main menu, coursebot, or between screens
+    persisted = _load_state()
+    if has_player and persisted == STATE_UNKNOWN:
+        return STATE_TITLE
+    return persisted
+
+# Menu cursor taps: 60 ms press, 140 ms release (menus latch within a frame)
+_DOWN_X2 = [(Btn.DOWN, 60), (0, 140)] * 2
+_DOWN_X3 = [(Btn.DOWN, 60), (0, 140)] * 3
+_TITLE_SKIP_TO_EDITOR = [(Btn.L | Btn.R, 2000), (0, 2000), (Btn.A, 100), (0, 5000)]
+
+# One-hop navigation edges: (from, to) → Transition. goto() chains these
+# along the route from _plan_route(); each hop saves its state.
+Transition = collections.namedtuple("Transition", "message steps gate")
+_TRANSITIONS = {
+    # Play the CURRENT editor level from start (long MINUS). To play the test
+    # level instead, go via coursebot.
+    (STATE_EDITOR, STATE_PLAYING): Transition(
+        "  Editor → Playing (long MINUS for level start)",
+        [(Btn.MINUS, 1200), (0, 3000)], _GATE_LEFT_EDITOR),
+    (STATE_PAUSE, STATE_PLAYING): Transition(
+        "  Pause → Playing (short MINUS)",
+        [(Btn.MINUS, 100), (0, 1000)], None),
+    # Select first course (test) → course detail, cursor on Make → DOWN x3
+    # to Play → A (single press in coursebot) → level load + title card
+    (STATE_COURSEBOT, STATE_PLAYING): Transition(
+        "  Coursebot → select test → Play",
+        [(Btn.A, 100), (0, 2000)] + _DOWN_X3 + [(Btn.A, 100), (0, 4000)],
+        _GATE_HAS_PLAYER),
+    # L+R skip lands in Course Maker editor (NOT main menu); editor takes a
+    # moment to load
+    (STATE_TITLE, STATE_EDITOR): Transition(
+        "  Title → skip (L+R → editor)",
+        _TITLE_SKIP_TO_EDITOR, _GATE_IN_EDITOR),
+    # Long MINUS → pause menu: Start Over / Exit Course / Edit Course.
+    # Need DOWN x2 to reach Edit Course (DOWN x1 = Exit Course!)
+    (STATE_PLAYING, STATE_EDITOR): Transition(
+        "  Playing → Pause → Edit Course",
+        [(Btn.MINUS, 1200), (0, 2000)] + _DOWN_X2 + [(Btn.A, 100), (0, 3000)],
+        _GATE_IN_EDITOR),
+    (STATE_PAUSE, STATE_EDITOR): Transition(
+        "  Pause → Edit Course (DOWN x2 → A)",
+        _DOWN_X2 + [(Btn.A, 100), (0, 3000)], _GATE_IN_EDITOR),
+    # Select test → Make (default selection)
+    (STATE_COURSEBOT, STATE_EDITOR): Transition(
+        "  Coursebot → select test → Make",
+        [(Btn.A, 100), (0, 2000), (Btn.A, 100), (0, 3000)], _GATE_IN_EDITOR),
+    # Course Maker is selected on the main menu; Coursebot is RIGHT
+    (STATE_MAIN_MENU, STATE_COURSEBOT): Transition(
+        "  Main menu → Coursebot (RIGHT → A)",
+        [(Btn.RIGHT, 100), (0, 800), (Btn.A, 100), (0, 3000)], None),
+    (STATE_EDITOR, STATE_MAIN_MENU): Transition(
+        "  Editor → Main menu (PLUS)",
+        [(Btn.PLUS, 100), (0, 2000)], None),
+    # Pause menu: Start Over → DOWN → Exit Course
+    (STATE_PLAYING, STATE_MAIN_MENU): Transition(
+        "  Playing → Pause → Exit Course",
+        [(Btn.MINUS, 1200), (0, 2000), (Btn.DOWN, 100), (0, 800), (Btn.A, 100), (0, 3000)],
+        None),
+    (STATE_COURSEBOT, STATE_MAIN_MENU): Transition(
+        "  Coursebot → B to exit",
+        [(Btn.B, 100), (0, 2000)], None),
+}
+
+# Routes that must not take the shortest path. From the title the editor
+# has whatever level was last open, so reach the test level via coursebot.
+_ROUTE_VIA = {
+    (STATE_TITLE, STATE_PLAYING): (STATE_EDITOR, STATE_MAIN_MENU, STATE_COURSEBOT, STATE_PLAYING),
+}
+
+
+_MAX_REPLANS = 2    # goto(): fresh routes after a gated hop times out
+
+
+@functools.lru_cache(maxsize=None)
+def _plan_route(current, target):
+    """States to pass through from current to target (excluding current),
+    or None if _TRANSITIONS has no route. Breadth-first, so fewest hops."""
+    if (current, target) in _ROUTE_VIA:
+        return _ROUTE_VIA[(current, target)]
+    came_from = {current: None}
+    frontier = [current]
+    while frontier and target not in came_from:
+        nxt = []
+        for state in frontier:
+            for (src, dst) in _TRANSITIONS:
+                if src == state and dst not in came_from:
+                    came_from[dst] = state
+                    nxt.append(dst)
+        frontier = nxt
+    if target not in came_from:
+        return None
+    route = []
+    while target != current:
+        route.append(target)
+        target = came_from[target]
+    return tuple(reversed(route))
+
 
 def goto(target):
     """Navigate from current state to target state. Returns True on success."""
     current = detect_state()
-    print(f"goto: {current} → {target}")
+    log.info("goto: %s → %s", current, target)
 
     if current == target:
-        print(f"Already at {target}")
+        log.info("Already at %s", target)
         return True
 
-    # Define transitions
-    if target == STATE_PLAYING:
-        return _goto_playing(current)
-    elif target == STATE_EDITOR:
-        return _goto_editor(current)
-    elif target == STATE_COURSEBOT:
-        return _goto_coursebot(current)
-    elif target == STATE_MAIN_MENU:
-        return _goto_main_menu(current)
-    else:
-        print(f"Don't know how to reach '{target}'")
-        return False
-
-def _goto_playing(current):
-    """Get into play mode on the test level."""
-    if current == STATE_EDITOR:
-        # Two options:
-        # 1. Play the CURRENT editor level: short/long MINUS
-        # 2. Play the TEST level: go via coursebot
-        # Default: play current level from start (long MINUS)
-        print("  Editor → Playing (long MINUS for level start)")
-        hold("MINUS", 1200)
-        wait(3000)
-        _save_state(STATE_PLAYING)
-        return True
-    elif current == STATE_PAUSE:
-        # Unpause
-        print("  Pause → Playing (short MINUS)")
-        press("MINUS", 100)
-        wait(1000)
-        _save_state(STATE_PLAYING)
-        return True
-    elif current == STATE_COURSEBOT:
-        # Already in coursebot — select test level → Play
-        print("  Coursebot → select test → Play")
-        press("A", 100)         # Select first course (test)
-        wait(2000)
-        # Now on course detail — cursor defaults to Make
-        # Navigate to Play: DOWN x3
-        for _ in range(3):
-            press("DOWN", 100)
-            wait(800)
-        press("A", 100)         # Play (single press in coursebot)
-        wait(4000)              # Wait for level load + title card
-        _save_state(STATE_PLAYING)
-        return True
-    elif current == STATE_MAIN_MENU:
-        # Main menu → Coursebot → Play
-        if _goto_coursebot(current):
-            return _goto_playing(STATE_COURSEBOT)
-        return False
-    elif current == STATE_TITLE:
-        # Title → L+R skip → lands in Course Maker editor (NOT main menu)
-        print("  Title → skip (L+R → editor)")
-        hold("L,R", 2000)
-        wait(2000)
-        press("A", 100)
-        wait(5000)              # Editor takes a moment to load
-        _save_state(STATE_EDITOR)
-        # Editor has whatever level was last open — go via coursebot to load test level
-        if _goto_coursebot(STATE_EDITOR):
-            return _goto_playing(STATE_COURSEBOT)
+    if not any(dst == target for (_, dst) in _TRANSITIONS):
+        log.warning("Don't know how to reach '%s'", target)
         return False
-    else:
-        print(f"  Don't know how to go from {current} to playing")
+    route = _plan_route(current, target)
+    replans = 0
+    while route:
+        state = route[0]
+        hop = _TRANSITIONS[(current, state)]
+        log.info(hop.message)
+        if hop.gate is None:
+            sequence(hop.steps)
+        else:
+            peek, ready = hop.gate
+            before = peek()
+            if (not _play_gated(hop.steps, hop.gate, f"goto {current}>{state}")
+                    and not ready(peek())):
+                # Gate timed out. Never record a state we didn't reach:
+                # replay the hop only if status.bin shows the game didn't
+                # react at all, re-plan only from a state detect_state()
+                # sees in status.bin, and otherwise give up
+                if replans >= _MAX_REPLANS:
+                    log.warning("  %s not reached after %d re-plans", state, replans)
+                    return False
+                replans += 1
+                after = peek()
+                if before is not None and after == before:
+                    log.warning("  %s not reached (no change), replaying hop", state)
+                    continue
+                seen = detect_state()
+                if seen in (current, state, STATE_UNKNOWN):
+                    log.warning("  %s not reached (at %s?), giving up", state, seen)
+                    return False
+                log.warning("  %s not reached (at %s), re-planning", state, seen)
+                current = seen
+                route = _plan_route(current, target)
+                continue
+        _save_state(state)
+        current = state
+        route = route[1:]
+    if route is None:
+        log.warning("  Don't know how to go from %s to %s", current, target)
         return False
+    return True
 
-def _goto_editor(current):
-    """Get into Course Maker editor."""
-    if current == STATE_PLAYING:
-        # Long MINUS → pause menu: Start Over / Exit Course / Edit Course
-        # Need DOWN x2 to reach Edit Course (DOWN x1 = Exit Course!)
-        print("  Playing → Pause → Edit Course")
-        hold("MINUS", 1200)
-        wait(2000)              # Wait for pause menu to fully render
-        press("DOWN", 100)
-        wait(800)
-        press("DOWN", 100)
-        wait(800)
-        press("A", 100)         # Edit Course
-        wait(3000)              # Wait for editor to load
-        _save_state(STATE_EDITOR)
-        return True
-    elif current == STATE_PAUSE:
-        # Pause menu: Start Over / Exit Course / Edit Course
-        print("  Pause → Edit Course (DOWN x2 → A)")
-        press("DOWN", 100)
-        wait(800)
-        press("DOWN", 100)
-        wait(800)
-        press("A", 100)
-        wait(3000)
-        _save_state(STATE_EDITOR)
-        return True
-    elif current == STATE_COURSEBOT:
-        # Select test → Make
-        print("  Coursebot → select test → Make")
-        press("A", 100)         # Select first course
-        wait(2000)
-        press("A", 100)         # Make (default selection)
-        wait(3000)
-        _save_state(STATE_EDITOR)
-        return True
-    elif current == STATE_MAIN_MENU:
-        if _goto_coursebot(current):
-            return _goto_editor(STATE_COURSEBOT)
-        return False
-    else:
-        print(f"  Don't know how to go from {current} to editor")
-        return False
 
-def _goto_coursebot(current):
-    """Get to the Coursebot course list."""
-    if current == STATE_MAIN_MENU:
-        print("  Main menu → Coursebot (RIGHT → A)")
-        # From main menu, Course Maker is selected. Coursebot is RIGHT.
-        press("RIGHT", 100)
-        wait(800)
-        press("A", 100)
-        wait(3000)              # Coursebot load animation
-        _save_state(STATE_COURSEBOT)
-        return True
-    elif current == STATE_EDITOR:
-        # Editor → PLUS → main menu → RIGHT → coursebot
-        print("  Editor → Main menu (PLUS)")
-        press("PLUS", 100)
-        wait(2000)
-        _save_state(STATE_MAIN_MENU)
-        return _goto_coursebot(STATE_MAIN_MENU)
-    elif current == STATE_PLAYING:
-        # Playing → pause → Exit Course (DOWN x1) → main menu → coursebot
-        print("  Playing → Pause → Exit Course")
-        hold("MINUS", 1200)
-        wait(2000)
-        press("DOWN", 100)      # Start Over → Exit Course
-        wait(800)
-        press("A", 100)         # Exit Course
-        wait(3000)
-        _save_state(STATE_MAIN_MENU)
-        return _goto_coursebot(STATE_MAIN_MENU)
-    else:
-        print(f"  Don't know how to go from {current} to coursebot")
-        return False
+def _cmd_release():
+    write_input(0)
+    print("Released all buttons")
 
-def _goto_main_menu(current):
-    """Get to the main menu."""
-    if current == STATE_EDITOR:
-        print("  Editor → Main menu (PLUS)")
-        press("PLUS", 100)
-        wait(2000)
-        _save_state(STATE_MAIN_MENU)
-        return True
-    elif current == STATE_PLAYING:
-        print("  Playing → Pause → Exit Course")
-        hold("MINUS", 1200)
-        wait(1500)
-        press("DOWN", 100)      # Exit Course
-        wait(500)
-        press("A", 100)
-        wait(3000)
-        _save_state(STATE_MAIN_MENU)
-        return True
-    elif current == STATE_COURSEBOT:
-        print("  Coursebot → B to exit")
-        press("B", 100)
-        wait(2000)
-        _save_state(STATE_MAIN_MENU)
-        return True
-    elif current == STATE_TITLE:
-        # L+R skip goes to editor, then PLUS to main menu
-        print("  Title → skip → editor → PLUS → main menu")
-        hold("L,R", 2000)
-        wait(2000)
-        press("A", 100)
-        wait(5000)
-        _save_state(STATE_EDITOR)
-        return _goto_main_menu(STATE_EDITOR)
-    else:
-        print(f"  Don't know how to go from {current} to main_menu")
-        return False
 
+def _cmd_press():
+    if len(sys.argv) < 3:
+        print("Usage: automate.py press <buttons>")
+        sys.exit(1)
+    press(sys.argv[2])
+    print(f"Pressed {sys.argv[2]}")
 
-def main():
-    if len(sys.argv) < 2:
-        print(__doc__)
+
+def _cmd_hold():
+    if len(sys.argv) < 4:
+        print("Usage: automate.py hold <buttons> <ms>")
         sys.exit(1)
+    hold(sys.argv[2], int(sys.argv[3]))
+    print(f"Held {sys.argv[2]} for {sys.argv[3]}ms")
 
-    cmd = sys.argv[1]
-
-    if cmd == "title-skip":
-        title_skip()
-    elif cmd == "load-test-level":
-        full_load_test_level()
-    elif cmd == "coursebot":
-        navigate_to_coursebot()
-    elif cmd == "main-menu":
-        navigate_to_main_menu()
-    elif cmd == "course-maker":
-        course_maker()
-    elif cmd == "play":
-        enter_play()
-    elif cmd == "play-reset":
-        enter_play_reset()
-    elif cmd == "make":
-        enter_make()
-    elif cmd == "reset-level":
-        reset_level()
-    elif cmd == "reposition":
-        reposition_mario()
-    elif cmd == "release":
-        write_input(0)
-        print("Released all buttons")
-    elif cmd == "press":
-        if len(sys.argv) < 3:
-            print("Usage: automate.py press <buttons>")
-            sys.exit(1)
-        press(sys.argv[2])
-        print(f"Pressed {sys.argv[2]}")
-    elif cmd == "hold":
-        if len(sys.argv) < 4:
-            print("Usage: automate.py hold <buttons> <ms>")
-            sys.exit(1)
-        hold(sys.argv[2], int(sys.argv[3]))
-        print(f"Held {sys.argv[2]} for {sys.argv[3]}ms")
-    elif cmd == "screenshot":
-        path = screenshot()
-        print(f"Screenshot saved: {path}")
-    elif cmd == "goto":
-        if len(sys.argv) < 3:
-            print("Usage: automate.py goto <state>")
-            print(f"States: playing, editor, coursebot, main_menu")
-            sys.exit(1)
-        target = sys.argv[2]
-        aliases = {"play": STATE_PLAYING, "playing": STATE_PLAYING,
-                   "edit": STATE_EDITOR, "editor": STATE_EDITOR,
-                   "coursebot": STATE_COURSEBOT, "menu": STATE_MAIN_MENU,
-                   "main_menu": STATE_MAIN_MENU}
-        target = aliases.get(target, target)
-        if not goto(target):
-            sys.exit(1)
-    elif cmd == "state":
-        st = detect_state()
-        print(f"Current state: {st}")
-    elif cmd == "set-state":
-        if len(sys.argv) < 3:
-            print("Usage: automate.py set-state <state>")
-            sys.exit(1)
-        _save_state(sys.argv[2])
-        print(f"State set to: {sys.argv[2]}")
-    elif cmd == "status":
-        # First: check if emulator is running
-        emu = "eden" if _use_eden else "ryujinx"
-        sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+def _cmd_tap():
+    if len(sys.argv) < 3:
+        print("Usage: automate.py tap <buttons> [frames]")
+        sys.exit(1)
+    frames = int(sys.argv[3]) if len(sys.argv) > 3 else 6
+    press_frames(sys.argv[2], frames)
+    print(f"Tapped {sys.argv[2]} for {frames} frames")
+
+
+def _cmd_screenshot():
+    path = screenshot()
+    print(f"Screenshot saved: {path}")
+
+
+def _cmd_goto():
+    if len(sys.argv) < 3:
+        print("Usage: automate.py goto <state>")
+        print(f"States: playing, editor, coursebot, main_menu")
+        sys.exit(1)
+    target = sys.argv[2]
+    aliases = {"play": STATE_PLAYING, "playing": STATE_PLAYING,
+               "edit": STATE_EDITOR, "editor": STATE_EDITOR,
+               "coursebot": STATE_COURSEBOT, "menu": STATE_MAIN_MENU,
+               "main_menu": STATE_MAIN_MENU}
+    target = aliases.get(target, target)
+    if not goto(target):
+        sys.exit(1)
+
+
+def _cmd_state():
+    st = detect_state()
+    print(f"Current state: {st}")
+
+
+def _cmd_set_state():
+    if len(sys.argv) < 3:
+        print("Usage: automate.py set-state <state>")
+        sys.exit(1)
+    _save_state(sys.argv[2])
+    print(f"State set to: {sys.argv[2]}")
+
+
+def _status_line(s, stale=""):
+    """Compact one-line summary of a status dict."""
+    hp = "👤" if s.get('has_player') else "  "
+    dead = "💀" if s.get('is_dead') else ""
+    goal = "🏁" if s.get('is_goal') else ""
+    phase = s.get('real_game_phase', -99)
+    return (f"Frame:{s.frame}{stale} | State:{s.player_state} {hp}{dead}{goal} | "
+            f"Pos:({s.pos_x:.0f},{s.pos_y:.0f}) | Vel:({s.vel_x:.1f},{s.vel_y:.1f}) | "
+            f"Phase:{phase} | Powerup:{s.powerup_id} | Polls:{s.get('input_polls',0)}")
+
+
+def _cmd_status_watch():
+    # One line per frame until Ctrl+C, from the background sampler. Frames it
+    # skipped between two samples are filled in from status_ring.bin.
+    last = None
+    try:
+        while True:
+            s = latest_status(timeout_s=1.0)
+            if s is None:
+                if last is not None:
+                    print("❌ No status.bin")
+                last = None
+            elif last is None or s.frame != last.frame:
+                lines = []
+                if last is not None and s.frame - last.frame > 1:
+                    lines = [_status_line(h) for h in status_history()
+                             if last.frame < h.frame < s.frame]
+                lines.append(_status_line(s))
+                sys.stdout.write('\n'.join(lines) + '\n')
+                sys.stdout.flush()
+                last = s
+    except KeyboardInterrupt:
+        pass
+
+
+def _cmd_status():
+    if "--watch" in sys.argv:
+        return _cmd_status_watch()
+    # A frame counter that advances across the 100 ms stale check proves the
+    # emulator is running, so tasklist.exe (a Windows process spawn) only
+    # runs when status.bin is missing or stuck.
+    emu = "eden" if _use_eden else "ryujinx"
+    s = read_status()
+    if s:
+        f1 = s.frame
+        time.sleep(0.1)
+        f2 = _peek_frame()
+        if f2 is None:
+            f2 = f1
+    if not s or f1 == f2:
+        sys.path.insert(0, _TOOLS_DIR)
         import emu_session
-        running = emu_session.is_running(emu)
-        if not running:
+        if not emu_session.is_running(emu):
             print(f"❌ {emu} not running")
             sys.exit(1)
-        
-        s = read_status()
-        if not s:
-            print(f"✅ {emu} running | ❌ No status.bin (hooks not loaded?)")
-            sys.exit(1)
-        
-        # Stale detection: read twice, check if frame advances
-        f1 = s['frame']
-        time.sleep(0.1)
-        s2 = read_status()
-        f2 = s2['frame'] if s2 else f1
-        stale = " ⚠️  STALE" if f1 == f2 else ""
-        
-        # Compact one-line summary
-        hp = "👤" if s.get('has_player') else "  "
-        dead = "💀" if s.get('is_dead') else ""
-        goal = "🏁" if s.get('is_goal') else ""
-        phase = s.get('real_game_phase', -99)
-        print(f"Frame:{s['frame']}{stale} | State:{s['player_state']} {hp}{dead}{goal} | "
-              f"Pos:({s['pos_x']:.0f},{s['pos_y']:.0f}) | Vel:({s['vel_x']:.1f},{s['vel_y']:.1f}) | "
-              f"Phase:{phase} | Powerup:{s['powerup_id']} | Polls:{s.get('input_polls',0)}")
-        
-        # Verbose if requested
-        if "--verbose" in sys.argv or "-v" in sys.argv:
-            print(f"  StateFrames: {s.get('state_frames',0)}")
-            print(f"  Water: {s.get('in_water',0)}  Facing: {s.get('facing',0):.1f}  Gravity: {s.get('gravity',0):.2f}")
-            print(f"  Theme: {s.get('course_theme', '?')}  Style: {s.get('game_style', '?')}")
-    elif cmd == "boot":
-        # Full boot-to-play sequence. Handles GDB connection for Eden.
-        # Usage: automate.py [--eden] boot [play|editor|menu]
-        target = sys.argv[2] if len(sys.argv) > 2 else "play"
-        boot(target)
-
-    elif cmd == "deploy":
-        # Deploy built NSO to emulator mod folder
-        import shutil
-        build_nso = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "build", "smm2-hooks.nso")
-        build_npdm = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "build", "main.npdm")
-        if not os.path.exists(build_nso):
-            print("Error: build/smm2-hooks.nso not found. Run ninja -C build first.")
+    if not s:
+        print(f"✅ {emu} running | ❌ No status.bin (hooks not loaded?)")
+        sys.exit(1)
+    stale = " ⚠️  STALE" if f1 == f2 else ""
+    
+    print(_status_line(s, stale))
+    
+    # Verbose if requested
+    if "--verbose" in sys.argv or "-v" in sys.argv:
+        print(f"  StateFrames: {s.get('state_frames',0)}\n"
+              f"  Water: {s.get('in_water',0)}  Facing: {s.get('facing',0):.1f}  Gravity: {s.get('gravity',0):.2f}\n"
+              f"  Theme: {s.get('course_theme', '?')}  Style: {s.get('game_style', '?')}")
+
+
+def _cmd_boot():
+    # Full boot-to-play sequence. Handles GDB connection for Eden.
+    # Usage: automate.py [--eden] boot [play|editor|menu]
+    target = sys.argv[2] if len(sys.argv) > 2 else "play"
+    boot(target)
+
+
+def _cmd_deploy():
+    # Deploy built NSO to emulator mod folder
+    sys.path.insert(0, _TOOLS_DIR)
+    from emu_session import copy_file, is_deployed_copy
+    build_nso, build_npdm = _BUILD_NSO, _BUILD_NPDM
+    if not os.path.exists(build_nso):
+        print("Error: build/smm2-hooks.nso not found. Run ninja -C build first.")
+        sys.exit(1)
+    if _use_eden:
+        dest = os.environ.get("EDEN_MODS_PATH", "")
+        if not dest:
+            print("Error: EDEN_MODS_PATH not set in .env")
             sys.exit(1)
-        if _use_eden:
-            dest = os.environ.get("EDEN_MODS_PATH", "")
-            if not dest:
-                print("Error: EDEN_MODS_PATH not set in .env")
-                sys.exit(1)
-        else:
-            dest = os.environ.get("MODS_DEPLOY_PATH", "")
-            if not dest:
-                print("Error: MODS_DEPLOY_PATH not set in .env")
-                sys.exit(1)
-        os.makedirs(dest, exist_ok=True)
-        shutil.copy2(build_nso, os.path.join(dest, "subsdk4"))
-        if os.path.exists(build_npdm):
-            shutil.copy2(build_npdm, os.path.join(dest, "main.npdm"))
-        emu = "Eden" if _use_eden else "Ryujinx"
-        print(f"Deployed to {emu}: {dest}")
     else:
-        print(f"Unknown command: {cmd}")
+        dest = os.environ.get("MODS_DEPLOY_PATH", "")
+        if not dest:
+            print("Error: MODS_DEPLOY_PATH not set in .env")
+            sys.exit(1)
+    os.makedirs(dest, exist_ok=True)
+    copies = [(build_nso, os.path.join(dest, "subsdk4"))]
+    if os.path.exists(build_npdm):
+        copies.append((build_npdm, os.path.join(dest, "main.npdm")))
+    # copy_file keeps mtimes, so an unchanged build matches what's deployed
+    copies = [(src, dst) for src, dst in copies if not is_deployed_copy(src, dst)]
+    emu = "Eden" if _use_eden else "Ryujinx"
+    if not copies:
+        print(f"Up to date in {emu}: {dest}")
+        return
+    for src, dst in copies:
+        copy_file(src, dst)
+    print(f"Deployed to {emu}: {dest}")
+
+
+def _cmd_batch():
+    # One command per stdin line (same syntax as the CLI, # for comments),
+    # run in this process so input.bin/status.bin stay open between them.
+    # A command that exits with an error stops the batch with its code.
+    for line in sys.stdin:
+        argv = shlex.split(line, comments=True)
+        if not argv:
+            continue
+        if argv[0] == "batch":
+            print("batch: nested batch not supported")
+            sys.exit(1)
+        try:
+            _dispatch(argv)
+        except SystemExit as e:
+            if e.code:
+                raise
+        sys.stdout.flush()
+
+
+COMMANDS = {
+    "title-skip": title_skip,
+    "load-test-level": full_load_test_level,
+    "coursebot": navigate_to_coursebot,
+    "main-menu": navigate_to_main_menu,
+    "course-maker": course_maker,
+    "play": enter_play,
+    "play-reset": enter_play_reset,
+    "make": enter_make,
+    "reset-level": reset_level,
+    "reposition": reposition_mario,
+    "release": _cmd_release,
+    "press": _cmd_press,
+    "hold": _cmd_hold,
+    "tap": _cmd_tap,
+    "screenshot": _cmd_screenshot,
+    "goto": _cmd_goto,
+    "state": _cmd_state,
+    "set-state": _cmd_set_state,
+    "status": _cmd_status,
+    "boot": _cmd_boot,
+    "deploy": _cmd_deploy,
+    "batch": _cmd_batch,
+}
+
+
+def _dispatch(argv):
+    """Run COMMANDS[argv[0]] with sys.argv set to argv (handlers read their
+    arguments from sys.argv[2:]). Unknown commands print usage and exit 1."""
+    handler = COMMANDS.get(argv[0])
+    if handler is None:
+        print(f"Unknown command: {argv[0]}")
         print(__doc__)
         sys.exit(1)
+    sys.argv = sys.argv[:1] + argv
+    handler()
+
+
+def main():
+    # Only the CLI builds the listener, so importing automate doesn't pay for these
+    import logging.handlers
+    import queue
+    records = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(records, logging.StreamHandler(sys.stderr))
+    listener.start()
+    atexit.register(listener.stop)  # drains what's still queued
+    # QueueHandler formats the message; the listener's handler just writes it
+    logging.basicConfig(level=os.environ.get("AUTOMATE_LOG", "INFO").upper(),
+                        format="%(message)s",
+                        handlers=[logging.handlers.QueueHandler(records)])
+    if len(sys.argv) < 2:
+        print(__doc__)
+        sys.exit(1)
+
+    _dispatch(sys.argv[1:])
 
 
 if __name__ == "__main__":
@@ -13,14 +13,9 @@ POLL_MS = 50  # 50ms = 20Hz polling
 DEFAULT_FRAME_THRESHOLD = 400  # ~6.7s - intro animation must fully complete
 
 def wait_scene(g, target_mode, timeout=30):
-    """Wait for scene_mode, polling every POLL_MS."""
-    deadline = time.time() + timeout
-    while time.time() < deadline:
-        s = g.status()
-        if s and s['scene_mode'] == target_mode:
-            return s
-        time.sleep(POLL_MS / 1000)
-    return None
+    """Wait for scene_mode; wakes on status.bin writes, polls every POLL_MS."""
+    return g.wait_for(lambda s: s['scene_mode'] == target_mode, timeout,
+                      poll_interval=POLL_MS / 1000)
 
 def nav_to_coursebot_slot(g, slot, verbose=True):
     """Navigate from title to Coursebot and load a specific slot.
@@ -114,11 +109,10 @@ def main():
     print(f"Title in {time.time()-t0:.1f}s")
     
     # Wait for frame threshold
-    while True:
-        s = g.status()
-        if s and s['frame'] >= args.frame:
-            break
-        time.sleep(POLL_MS / 1000)
+    s = None
+    while s is None:
+        s = g.wait_for(lambda s: s['frame'] >= args.frame, 60,
+                       poll_interval=POLL_MS / 1000)
     print(f"Input at frame {s['frame']}")
     
     if args.slot is not None:
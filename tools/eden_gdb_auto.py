@@ -18,6 +18,7 @@ import os
 import json
 
 TMUX_SESSION = "eden-gdb"
+PANE_POLL_S = 0.05  # capture-pane interval while waiting on GDB output
 STATE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".eden_state.json")
 
 # changeState byte signature (position-independent)
@@ -36,11 +37,12 @@ def save_state(state):
         json.dump(state, f, indent=2)
 
 
-def tmux_send(cmd, wait=1.0):
+def tmux_send(cmd, wait=0):
     """Send command to eden-gdb tmux session."""
     subprocess.run(["tmux", "send-keys", "-t", TMUX_SESSION, cmd, "Enter"],
                    capture_output=True, timeout=5)
-    time.sleep(wait)
+    if wait:
+        time.sleep(wait)
 
 
 def tmux_read(lines=30):
@@ -52,6 +54,23 @@ def tmux_read(lines=30):
     return result.stdout
 
 
+def wait_pane(predicate, timeout, lines=30):
+    """Re-read the pane every PANE_POLL_S until predicate(output) holds or
+    timeout runs out. Returns the last output read."""
+    deadline = time.monotonic() + timeout
+    while True:
+        output = tmux_read(lines)
+        if predicate(output) or time.monotonic() >= deadline:
+            return output
+        time.sleep(PANE_POLL_S)
+
+
+def at_prompt(output):
+    """True if the last non-empty pane line is a bare (gdb) prompt."""
+    lines = [line.strip() for line in output.split('\n') if line.strip()]
+    return bool(lines) and lines[-1] == '(gdb)'
+
+
 def tmux_alive():
     """Check if tmux session exists."""
     result = subprocess.run(["tmux", "has-session", "-t", TMUX_SESSION],
@@ -78,7 +97,7 @@ def ensure_gdb():
         # Try interrupting
         subprocess.run(["tmux", "send-keys", "-t", TMUX_SESSION, "", "C-c"],
                        capture_output=True, timeout=5)
-        time.sleep(2)
+        wait_pane(at_prompt, 2, 5)
         if not gdb_at_prompt():
             print("ERROR: GDB not at prompt. Game might be running.")
             print("Interrupt with: tmux send-keys -t eden-gdb C-c")
@@ -86,21 +105,31 @@ def ensure_gdb():
 
 
 def gdb_cmd(cmd, wait=1.0, expect_pattern=None, timeout=10):
-    """Send GDB command and return new output."""
+    """Send GDB command and return new output.
+
+    Returns as soon as expect_pattern shows up in the new output or, without
+    a pattern, as soon as GDB is back at its prompt; timeout/wait only bound
+    how long that may take.
+    """
     before = tmux_read(50)
-    tmux_send(cmd, wait)
+    tmux_send(cmd)
+
+    def new_output(after):
+        return after[len(before):] if after.startswith(before[:20]) else after
 
     if expect_pattern:
-        deadline = time.time() + timeout
-        while time.time() < deadline:
-            after = tmux_read(50)
-            new = after[len(before):] if after.startswith(before[:20]) else after
-            if re.search(expect_pattern, new):
-                return new
-            time.sleep(0.5)
-        return tmux_read(50)
+        after = wait_pane(lambda o: re.search(expect_pattern, new_output(o)), timeout, 50)
+        new = new_output(after)
+        return new if re.search(expect_pattern, new) else after
+
+    # The pane must have changed first: right after send-keys it may still
+    # show the previous prompt
+    return wait_pane(lambda o: o != before and at_prompt(o), wait, 50)
+
 
-    return tmux_read(50)
+def gdb_continue(timeout=0.5):
+    """Send `c` and return once GDB reports Continuing."""
+    return gdb_cmd("c", expect_pattern=r"Continuing\.", timeout=timeout)
 
 
 def cmd_find_func():
@@ -144,7 +173,7 @@ def cmd_get_player(max_attempts=5):
     gdb_cmd(f"hbreak *{cs_addr}", wait=0.5)
 
     print("Continuing... (need gameplay state change)")
-    gdb_cmd("c", wait=0.5)
+    gdb_continue()
 
     # Wait for breakpoint hit on MainThread
     deadline = time.time() + 30
@@ -152,16 +181,13 @@ def cmd_get_player(max_attempts=5):
     attempt = 0
 
     while time.time() < deadline and attempt < max_attempts:
-        time.sleep(2)
-        output = tmux_read(20)
+        # Stopped = back at the prompt (after `c` the pane ends in Continuing.)
+        output = wait_pane(at_prompt, deadline - time.time(), 20)
 
         if 'hit Breakpoint' in output or 'SIGTRAP' in output:
             attempt += 1
-            # Check if we're at prompt
-            if not gdb_at_prompt():
-                time.sleep(1)
-                if not gdb_at_prompt():
-                    continue
+            if not at_prompt(output):
+                continue
 
             # Read registers
             gdb_cmd("p/x $x0", wait=0.3)
@@ -188,21 +214,22 @@ def cmd_get_player(max_attempts=5):
                     print(f"  attempt {attempt}: state {x1} > 143, not player SM. Continuing...")
 
             # Continue to next hit
-            gdb_cmd("c", wait=0.5)
+            gdb_continue()
+        else:
+            time.sleep(PANE_POLL_S)  # stopped for something else; don't spin
 
     # Clean up: delete breakpoint, continue
     print("Cleaning up...")
     gdb_cmd(f"delete", wait=0.3)
-    gdb_cmd("c", wait=0.5)
+    gdb_continue()
 
-    # Verify game is running
-    time.sleep(1)
-    output = tmux_read(5)
+    # Verify game is running (a stale breakpoint stops it straight away)
+    output = wait_pane(at_prompt, 1, 5)
     if 'SIGTRAP' in output and gdb_at_prompt():
         # Stale breakpoint hit — step past and continue
         print("Clearing stale breakpoint...")
         gdb_cmd("si", wait=0.3)
-        gdb_cmd("c", wait=0.5)
+        gdb_continue()
 
     if player:
         print(f"\n✅ PlayerObject: {player:#x}")
@@ -257,13 +284,12 @@ def cmd_watch(addr_str, size_str="4"):
         return
 
     print("Continuing... waiting for watchpoint hit (30s timeout)")
-    gdb_cmd("c", wait=0.5)
+    gdb_continue()
 
     deadline = time.time() + 30
     while time.time() < deadline:
-        time.sleep(1)
-        if gdb_at_prompt():
-            output = tmux_read(20)
+        output = wait_pane(at_prompt, deadline - time.time(), 20)
+        if at_prompt(output):
             if 'watchpoint' in output.lower() or 'SIGTRAP' in output:
                 print("Watchpoint hit!")
                 # Read PC and backtrace
@@ -275,12 +301,13 @@ def cmd_watch(addr_str, size_str="4"):
 
                 # Clean up
                 gdb_cmd("delete", wait=0.3)
-                gdb_cmd("c", wait=0.5)
+                gdb_continue()
                 return
+        time.sleep(PANE_POLL_S)  # stopped for something else; don't spin
 
     print("Timeout — no watchpoint hit in 30s")
     gdb_cmd("delete", wait=0.3)
-    gdb_cmd("c", wait=0.5)
+    gdb_continue()
 
 
 COMMANDS = {
@@ -22,15 +22,20 @@ import subprocess
 import sys
 import os
 import json
+import mmap
+import shutil
 import time
 import struct
 
+from statuswatch import open_ro, wait_status_event
+
 TASKLIST = "/mnt/c/Windows/System32/tasklist.exe"
 TASKKILL = "/mnt/c/Windows/System32/taskkill.exe"
 
 # Load .env
 ENV = {}
-env_path = os.path.join(os.path.dirname(__file__), '..', '.env')
+TOOLS_DIR = os.path.dirname(os.path.abspath(__file__))
+env_path = os.path.join(TOOLS_DIR, '..', '.env')
 if os.path.exists(env_path):
     with open(env_path) as f:
         for line in f:
@@ -43,7 +48,7 @@ EDEN_CONFIG = '/mnt/c/Users/nico/AppData/Roaming/eden/config/qt-config.ini'
 EDEN_SD = ENV.get('EDEN_SD_PATH', '/mnt/c/Users/nico/AppData/Roaming/eden/sdmc/smm2-hooks')
 EDEN_MODS = ENV.get('EDEN_MODS_PATH', '/mnt/c/Users/nico/Documents/eden/load/01009B90006DC000/smm2-hooks/exefs')
 RYUJINX_SD = ENV.get('RYUJINX_SD_PATH', '')
-HOOKS_BUILD = os.path.join(os.path.dirname(__file__), '..', 'build', 'smm2-hooks.nso')
+HOOKS_BUILD = os.path.join(TOOLS_DIR, '..', 'build', 'smm2-hooks.nso')
 
 EMULATORS = {
     'eden': {
@@ -66,6 +71,9 @@ EMULATORS = {
     },
 }
 
+# Written by launch, removed by cleanup once the process is gone
+PID_FILES = {emu: os.path.join(TOOLS_DIR, f'.{emu}_pid') for emu in EMULATORS}
+
 GDB_TMUX_SESSION = 'eden-gdb'
 
 
@@ -194,6 +202,36 @@ def hooks_built():
     return os.path.exists(HOOKS_BUILD)
 
 
+def copy_file(src, dst):
+    """Copy src to dst with os.sendfile (kernel-side, no userspace buffer),
+    then copy its mtime/mode like shutil.copy2."""
+    with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+        size = os.fstat(fsrc.fileno()).st_size
+        offset = 0
+        try:
+            while offset < size:
+                sent = os.sendfile(fdst.fileno(), fsrc.fileno(), offset, size - offset)
+                if sent == 0:
+                    break
+                offset += sent
+        except OSError:
+            # Filesystem without sendfile support: finish with a buffered copy
+            fsrc.seek(offset)
+            fdst.seek(offset)
+            shutil.copyfileobj(fsrc, fdst)
+    shutil.copystat(src, dst)
+
+
+def is_deployed_copy(src, dst):
+    """True if dst has src's size and mtime, i.e. copy_file(src, dst) is a no-op.
+    mtime is compared in whole seconds: /mnt/c (NTFS) doesn't keep nanoseconds."""
+    try:
+        s, d = os.stat(src), os.stat(dst)
+    except FileNotFoundError:
+        return False
+    return s.st_size == d.st_size and int(s.st_mtime) == int(d.st_mtime)
+
+
 def deploy_hooks(emu_name='eden'):
     """Deploy built hooks to emulator mod directory."""
     if not hooks_built():
@@ -205,8 +243,11 @@ def deploy_hooks(emu_name='eden'):
         print(f"❌ No mods path configured for {emu_name}")
         return False
     os.makedirs(mods, exist_ok=True)
-    import shutil
-    shutil.copy2(HOOKS_BUILD, os.path.join(mods, 'subsdk4'))
+    dst = os.path.join(mods, 'subsdk4')
+    if is_deployed_copy(HOOKS_BUILD, dst):
+        print(f"✅ Hooks up to date in {mods}/subsdk4")
+        return True
+    copy_file(HOOKS_BUILD, dst)
     print(f"✅ Deployed hooks to {mods}/subsdk4")
     return True
 
@@ -250,17 +291,31 @@ STATUS_FIELDS = [
     (0x60, 4, 'I', 'gpm_inner_5'),
 ]
 
+def _compile_status_fields():
+    """One Struct per STATUS_FIELDS prefix, longest first: (end, Struct, names).
+    Padding between fields becomes 'x' so each prefix unpacks in one call."""
+    prefixes = []
+    fmt, pos, names = '<', 0, []
+    for offset, size, type_char, name in STATUS_FIELDS:
+        fmt += 'x' * (offset - pos) + type_char
+        pos = offset + size
+        names.append(name)
+        prefixes.append((pos, struct.Struct(fmt), tuple(names)))
+    return prefixes[::-1]
+
+_STATUS_PREFIXES = _compile_status_fields()
+
+# input.bin block: buttons, stick_lx, stick_ly
+_S_INPUT = struct.Struct('<Qii')
+_input_maps = {}  # input.bin path → (fd, shared mapping or None), kept open
+_status_fds = {}  # status.bin path → (fd, inode) kept open for waiter polls
+
 def _parse_status_fields(data):
     """Parse status.bin bytes using STATUS_FIELDS layout."""
-    result = {}
-    for offset, size, fmt, name in STATUS_FIELDS:
-        if offset + size > len(data):
-            break
-        if size == 1:
-            result[name] = data[offset]
-        else:
-            result[name] = struct.unpack(f'<{fmt}', data[offset:offset+size])[0]
-    return result
+    for end, st, names in _STATUS_PREFIXES:
+        if end <= len(data):
+            return dict(zip(names, st.unpack_from(data, 0)))
+    return {}
 
 def read_status_bin(emu_name='eden'):
     """Read and parse status.bin from emulator's SD card."""
@@ -269,16 +324,19 @@ def read_status_bin(emu_name='eden'):
     if not sd:
         return None
     path = os.path.join(sd, 'status.bin')
-    if not os.path.exists(path):
-        return {'error': 'status.bin not found'}
     try:
         with open(path, 'rb') as f:
             data = f.read()
+            mtime = os.fstat(f.fileno()).st_mtime
+    except FileNotFoundError:
+        return {'error': 'status.bin not found'}
+    except Exception as e:
+        return {'error': str(e)}
+    try:
         if len(data) < 68:
             return {'error': f'status.bin too small ({len(data)} bytes)'}
         # Parse using shared STATUS_FIELDS layout (single source of truth)
         fields = _parse_status_fields(data)
-        mtime = os.path.getmtime(path)
         age = time.time() - mtime
         # Build result dict with both raw field names and legacy aliases
         result = dict(fields)
@@ -297,20 +355,40 @@ def read_status_bin(emu_name='eden'):
         return {'error': str(e)}
 
 
-def is_status_fresh(emu_name='eden', window=0.5):
-    """Check if status.bin is being actively updated."""
-    info = EMULATORS.get(emu_name, {})
-    sd = info.get('sd_path', '')
-    path = os.path.join(sd, 'status.bin') if sd else ''
-    if not os.path.exists(path):
-        return False
+def _poll_status(emu_name):
+    """status.bin fields for waiters: one pread on a kept-open fd, decoded by
+    the same prefix Structs as read_status_bin() but without its aliases,
+    age and raw-bytes copy. None if status.bin is unavailable."""
+    sd = EMULATORS.get(emu_name, {}).get('sd_path', '')
+    if not sd:
+        return None
+    path = os.path.join(sd, 'status.bin')
+    fd, ino = _status_fds.get(path, (None, None))
     try:
-        s1 = read_status_bin(emu_name)
-        time.sleep(window)
-        s2 = read_status_bin(emu_name)
-        return s1 and s2 and s1.get('frame', 0) != s2.get('frame', 0)
-    except:
+        st = os.stat(path)
+        if st.st_ino != ino:  # first poll, or the hook recreated the file
+            if fd is not None:
+                os.close(fd)
+            fd = open_ro(path)
+            _status_fds[path] = (fd, st.st_ino)
+        data = os.pread(fd, _STATUS_PREFIXES[0][0], 0)
+    except OSError:
+        if fd is not None:
+            os.close(fd)
+        _status_fds.pop(path, None)
+        return None
+    return _parse_status_fields(data) or None
+
+
+def is_status_fresh(emu_name='eden', window=0.5):
+    """Check if status.bin is being actively updated.
+    Returns True as soon as the frame advances, False if it doesn't within window."""
+    s1 = _poll_status(emu_name)
+    if s1 is None:
         return False
+    f1 = s1.get('frame', 0)
+    return _wait_frames(emu_name, 'frame', lambda s: s.get('frame', 0) != f1,
+                        timeout=window) is not None
 
 
 # ─── Commands ───
@@ -383,24 +461,40 @@ def cmd_status():
             print(f"  {label}  PID {p['pid']:>6}  {p['exe']:<20}  {mem_mb:.0f} MB")
 
 
+def _taskkill(plist):
+    """Force-kill processes with one taskkill.exe (one /PID per process).
+    Returns the set of PIDs that may still be running: empty if taskkill
+    exited 0, else the ones a single tasklist snapshot still shows (all of
+    them if taskkill couldn't run)."""
+    args = [TASKKILL, '/F']
+    for p in plist:
+        args += ['/PID', str(p['pid'])]
+    pids = {p['pid'] for p in plist}
+    try:
+        result = subprocess.run(args, capture_output=True, timeout=5 + len(plist))
+    except Exception as e:
+        print(f"ERROR: taskkill: {e}")
+        return pids
+    if result.returncode == 0:
+        return set()
+    return pids & {p['pid'] for procs in get_processes().values() for p in procs}
+
+
 def cmd_kill(target):
     """Kill emulator processes."""
     procs = get_processes()
     targets = list(EMULATORS.keys()) if target == 'all' else [target]
+    plist = [p for name in targets for p in procs.get(name, [])]
 
-    killed = 0
-    for name in targets:
-        for p in procs.get(name, []):
-            try:
-                subprocess.run([TASKKILL, '/PID', str(p['pid']), '/F'],
-                             capture_output=True, timeout=5)
-                print(f"Killed {p['exe']} PID {p['pid']}")
-                killed += 1
-            except Exception as e:
-                print(f"Failed to kill PID {p['pid']}: {e}")
-
-    if killed == 0:
+    if not plist:
         print(f"No {target} processes to kill.")
+        return
+    alive = _taskkill(plist)
+    for p in plist:
+        if p['pid'] in alive:
+            print(f"Failed to kill PID {p['pid']}")
+        else:
+            print(f"Killed {p['exe']} PID {p['pid']}")
 
 
 def cmd_launch(emu_name, gdb=False):
@@ -451,7 +545,7 @@ def cmd_launch(emu_name, gdb=False):
 
     if win_pid:
         # Save PID
-        pid_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), f'.{emu_name}_pid')
+        pid_file = PID_FILES[emu_name]
         with open(pid_file, 'w') as f:
             f.write(str(win_pid))
         print(f"✅ {emu_name} running (PID {win_pid})")
@@ -473,32 +567,33 @@ def cmd_hexdump(emu_name='eden'):
         print(f"❌ {status.get('error', 'no status')}" if status else "No status")
         return
     data = status.get('_raw_data', b'')
-    print(f"status.bin: {len(data)} bytes (expect {100} for StatusBlock)")
-    print(f"{'Offset':>6}  {'Hex':16}  {'Field':<20}  {'Value'}")
-    print("-" * 70)
+    out = [f"status.bin: {len(data)} bytes (expect {100} for StatusBlock)",
+           f"{'Offset':>6}  {'Hex':16}  {'Field':<20}  {'Value'}",
+           "-" * 70]
     # Build offset→field map
     field_at = {}
     for offset, size, fmt, name in STATUS_FIELDS:
-        field_at[offset] = (size, fmt, name)
+        field_at[offset] = (size, struct.Struct('<' + fmt), name)
     i = 0
     while i < len(data):
         if i in field_at:
-            size, fmt, name = field_at[i]
+            size, st, name = field_at[i]
             raw = data[i:i+size]
             hex_str = raw.hex()
             if size == 1:
                 val = raw[0]
             else:
-                val = struct.unpack(f'<{fmt}', raw)[0]
+                val = st.unpack(raw)[0]
             if isinstance(val, float):
-                print(f"0x{i:04X}  {hex_str:<16}  {name:<20}  {val:.4f}")
+                out.append(f"0x{i:04X}  {hex_str:<16}  {name:<20}  {val:.4f}")
             else:
-                print(f"0x{i:04X}  {hex_str:<16}  {name:<20}  {val} (0x{val:X})" if isinstance(val, int) and val > 9 else f"0x{i:04X}  {hex_str:<16}  {name:<20}  {val}")
+                out.append(f"0x{i:04X}  {hex_str:<16}  {name:<20}  {val} (0x{val:X})" if isinstance(val, int) and val > 9 else f"0x{i:04X}  {hex_str:<16}  {name:<20}  {val}")
             i += size
         else:
             # padding byte
-            print(f"0x{i:04X}  {data[i]:02x}{'':14}  {'(pad)':<20}  {data[i]}")
+            out.append(f"0x{i:04X}  {data[i]:02x}{'':14}  {'(pad)':<20}  {data[i]}")
             i += 1
+    sys.stdout.write('\n'.join(out) + '\n')
 
 def cmd_game_status(emu_name='eden', raw=False):
     """Read and display game status from status.bin."""
@@ -530,23 +625,27 @@ def cmd_game_status(emu_name='eden', raw=False):
     style_name = STYLES.get(status['game_style'], f"#{status['game_style']:#x}")
     powerup_name = POWERUPS.get(status['powerup'], f"#{status['powerup']}")
 
-    print(f"{fresh} Frame:{status['frame']} Age:{status['age_seconds']}s")
-    print(f"  Player:{status['has_player']} State:{state_name}({status['state']}) Phase:{status['real_game_phase']}")
-    print(f"  Pos:({status['pos_x']:.1f}, {status['pos_y']:.1f}) Vel:({status['vel_x']:.2f}, {status['vel_y']:.2f})")
-    print(f"  Gravity:{status['gravity']:.2f} Powerup:{powerup_name}({status['powerup']})")
     SCENES = {0: '???', 1: 'Editor', 5: 'Play', 6: 'Title/Menu'}
     scene = SCENES.get(status.get('scene_mode', 0), f"#{status.get('scene_mode', 0)}")
-    print(f"  Theme:{theme_name} Style:{style_name} Scene:{scene}")
+    # Built up and written once, so a piped reader never sees half a report
+    out = [
+        f"{fresh} Frame:{status['frame']} Age:{status['age_seconds']}s",
+        f"  Player:{status['has_player']} State:{state_name}({status['state']}) Phase:{status['real_game_phase']}",
+        f"  Pos:({status['pos_x']:.1f}, {status['pos_y']:.1f}) Vel:({status['vel_x']:.2f}, {status['vel_y']:.2f})",
+        f"  Gravity:{status['gravity']:.2f} Powerup:{powerup_name}({status['powerup']})",
+        f"  Theme:{theme_name} Style:{style_name} Scene:{scene}",
+    ]
     if status.get('state_frames'):
-        print(f"  StateFrames:{status['state_frames']} Facing:{status['facing']:.1f}")
+        out.append(f"  StateFrames:{status['state_frames']} Facing:{status['facing']:.1f}")
     if raw:
-        print("\n  Raw field dump (offset → value):")
+        out.append("\n  Raw field dump (offset → value):")
         for offset, size, fmt, name in STATUS_FIELDS:
             val = status.get(name, '?')
             if isinstance(val, float):
-                print(f"    0x{offset:04X} {name:<20} = {val:.4f}")
+                out.append(f"    0x{offset:04X} {name:<20} = {val:.4f}")
             else:
-                print(f"    0x{offset:04X} {name:<20} = {val}")
+                out.append(f"    0x{offset:04X} {name:<20} = {val}")
+    sys.stdout.write('\n'.join(out) + '\n')
 
 
 def _write_input(buttons=0, stick_lx=0, stick_ly=0):
@@ -559,9 +658,21 @@ def _write_input(buttons=0, stick_lx=0, stick_ly=0):
     if not sd:
         return
     path = os.path.join(sd, 'input.bin')
-    data = struct.pack('<Qii', buttons, stick_lx, stick_ly)
-    with open(path, 'wb') as f:
-        f.write(data)
+    entry = _input_maps.get(path)
+    if entry is None:
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        if os.fstat(fd).st_size < _S_INPUT.size:
+            os.ftruncate(fd, _S_INPUT.size)
+        try:
+            mm = mmap.mmap(fd, _S_INPUT.size)
+        except (ValueError, OSError):
+            mm = None  # filesystem refuses the mapping: pwrite instead
+        entry = _input_maps[path] = (fd, mm)
+    fd, mm = entry
+    if mm is not None:
+        _S_INPUT.pack_into(mm, 0, buttons, stick_lx, stick_ly)
+    else:
+        os.pwrite(fd, _S_INPUT.pack(buttons, stick_lx, stick_ly), 0)
 
 
 def _press(buttons, duration_ms=100):
@@ -572,13 +683,15 @@ def _press(buttons, duration_ms=100):
 
 
 def _wait_frames(emu_name, target_field, target_check, timeout=15, label=""):
-    """Wait until a status field meets a condition. Returns status or None."""
+    """Wait until a status field meets a condition. Returns status or None.
+    Re-reads as soon as status.bin changes (inotify), at most 0.5 s apart."""
+    sd = EMULATORS.get(emu_name, {}).get('sd_path', '')
     deadline = time.time() + timeout
     while time.time() < deadline:
-        s = read_status_bin(emu_name)
-        if s and 'error' not in s and target_check(s):
+        s = _poll_status(emu_name)
+        if s and target_check(s):
             return s
-        time.sleep(0.5)
+        wait_status_event(min(0.5, max(deadline - time.time(), 0)), sd)
     return None
 
 
@@ -607,6 +720,15 @@ def _boot_and_verify(emu_name, gdb=False):
     if sd:
         for f in ['status.bin', 'input.bin']:
             p = os.path.join(sd, f)
+            # Drop cached fds/mappings so nothing keeps using the old inode
+            fd = _status_fds.pop(p, (None, None))[0]
+            if fd is not None:
+                os.close(fd)
+            fd, mm = _input_maps.pop(p, (None, None))
+            if mm is not None:
+                mm.close()
+            if fd is not None:
+                os.close(fd)
             if os.path.exists(p):
                 os.remove(p)
 
@@ -636,7 +758,7 @@ def _boot_and_verify(emu_name, gdb=False):
         return False
 
     # Save PID
-    pid_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), f'.{emu_name}_pid')
+    pid_file = PID_FILES[emu_name]
     with open(pid_file, 'w') as f:
         f.write(str(win_pid))
 
@@ -786,8 +908,7 @@ def cmd_fresh(emu_name='eden', gdb=False, navigate=True, max_retries=3):
             cmd_kill(emu_name)
             time.sleep(2)
 
-        if tmux_session_exists(GDB_TMUX_SESSION):
-            tmux_kill_session(GDB_TMUX_SESSION)
+        tmux_kill_session(GDB_TMUX_SESSION)  # no-op if it doesn't exist
 
         # Boot and verify
         print("② Booting...")
@@ -839,15 +960,16 @@ def cmd_cleanup():
     """Kill orphaned processes and stale tmux sessions."""
     # Kill orphaned emulator processes
     procs = get_processes()
-    for name, plist in procs.items():
-        for p in plist:
-            if p['mem_kb'] < 100000:  # small = probably stale
-                try:
-                    subprocess.run([TASKKILL, '/PID', str(p['pid']), '/F'],
-                                 capture_output=True, timeout=5)
-                    print(f"Killed orphaned {p['exe']} PID {p['pid']} ({p['mem_kb']//1024} MB)")
-                except:
-                    pass
+    orphans = [p for plist in procs.values() for p in plist
+               if p['mem_kb'] < 100000]  # small = probably stale
+    if orphans:
+        alive = _taskkill(orphans)
+        for p in orphans:
+            if p['pid'] in alive:
+                print(f"Failed to kill orphaned PID {p['pid']}")
+            else:
+                print(f"Killed orphaned {p['exe']} PID {p['pid']} ({p['mem_kb']//1024} MB)")
+        procs = get_processes()
 
     # List tmux sessions for manual review
     sessions = tmux_list_sessions()
@@ -860,12 +982,35 @@ def cmd_cleanup():
 
     # Clean up PID files for dead processes
     for emu in EMULATORS:
-        pid_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), f'.{emu}_pid')
-        if os.path.exists(pid_file) and not is_running(emu):
+        pid_file = PID_FILES[emu]
+        if os.path.exists(pid_file) and not procs.get(emu):
             os.remove(pid_file)
             print(f"Cleaned stale PID file for {emu}")
 
 
+def _arg_emu(args, default='eden'):
+    """First positional CLI argument (emulator name), skipping flags."""
+    return args[0] if args and not args[0].startswith('-') else default
+
+
+# CLI: command → handler(args after the command)
+COMMANDS = {
+    'fresh': lambda args: cmd_fresh(_arg_emu(args), '--gdb' in args,
+                                    navigate='--no-nav' not in args),
+    'overview': lambda args: cmd_overview(),
+    'status': lambda args: cmd_status(),
+    'kill': lambda args: cmd_kill(args[0] if args else 'all'),
+    'launch': lambda args: cmd_launch(args[0] if args else 'eden', '--gdb' in args),
+    'deploy': lambda args: cmd_deploy(args[0] if args else 'eden'),
+    'gdb-on': lambda args: gdb_set(True),
+    'gdb-off': lambda args: gdb_set(False),
+    'game-status': lambda args: cmd_game_status(args[0] if args else 'eden',
+                                                raw='--raw' in args),
+    'hexdump': lambda args: cmd_hexdump(args[0] if args else 'eden'),
+    'cleanup': lambda args: cmd_cleanup(),
+}
+
+
 def main():
     if len(sys.argv) < 2:
         print("SMM2 Emulator Session Manager")
@@ -884,41 +1029,12 @@ def main():
         sys.exit(0)
 
     cmd = sys.argv[1]
-    if cmd == 'fresh':
-        emu = sys.argv[2] if len(sys.argv) > 2 and not sys.argv[2].startswith('-') else 'eden'
-        gdb = '--gdb' in sys.argv
-        nav = '--no-nav' not in sys.argv
-        cmd_fresh(emu, gdb, navigate=nav)
-    elif cmd == 'overview':
-        cmd_overview()
-    elif cmd == 'status':
-        cmd_status()
-    elif cmd == 'kill':
-        cmd_kill(sys.argv[2] if len(sys.argv) > 2 else 'all')
-    elif cmd == 'launch':
-        emu = sys.argv[2] if len(sys.argv) > 2 else 'eden'
-        gdb = '--gdb' in sys.argv
-        cmd_launch(emu, gdb)
-    elif cmd == 'deploy':
-        emu = sys.argv[2] if len(sys.argv) > 2 else 'eden'
-        cmd_deploy(emu)
-    elif cmd == 'gdb-on':
-        gdb_set(True)
-    elif cmd == 'gdb-off':
-        gdb_set(False)
-    elif cmd == 'game-status':
-        emu = sys.argv[2] if len(sys.argv) > 2 else 'eden'
-        raw = '--raw' in sys.argv
-        cmd_game_status(emu, raw=raw)
-    elif cmd == 'hexdump':
-        emu = sys.argv[2] if len(sys.argv) > 2 else 'eden'
-        cmd_hexdump(emu)
-    elif cmd == 'cleanup':
-        cmd_cleanup()
-    else:
+    handler = COMMANDS.get(cmd)
+    if handler is None:
         print(f"Unknown command: {cmd}")
         print("Run without args for help.")
-
+        return
+    handler(sys.argv[2:])
 
 if __name__ == '__main__':
     main()
@@ -28,18 +28,20 @@ A     = 0x01
 B     = 0x02
 MINUS = 0x800
 
+# input.bin block, and the status.bin fields read_status() uses:
+# frame..vy @0, is_dead/is_goal @37, polls @52
+_S_INPUT = struct.Struct('<Qii')
+_S_STATUS = struct.Struct('<IIIIffff5xBB13xI')
+
 def write_input(buttons=0, lx=0, ly=0):
     with open(INPUT, 'wb') as f:
-        f.write(struct.pack('<Qii', buttons, lx, ly))
+        f.write(_S_INPUT.pack(buttons, lx, ly))
 
 def read_status():
     with open(STATUS, 'rb') as f:
         data = f.read(64)
-    frame, mode, state, powerup = struct.unpack_from('<IIII', data, 0)
-    px, py = struct.unpack_from('<ff', data, 16)
-    vx, vy = struct.unpack_from('<ff', data, 24)
-    is_dead, is_goal = struct.unpack_from('<BB', data, 37)
-    polls = struct.unpack_from('<I', data, 52)[0]
+    (frame, mode, state, powerup, px, py, vx, vy,
+     is_dead, is_goal, polls) = _S_STATUS.unpack_from(data, 0)
     return {
         'frame': frame, 'mode': mode, 'state': state,
         'x': px, 'y': py, 'vx': vx, 'vy': vy,
@@ -4,7 +4,7 @@ Usage:
     from smm2 import Game
     g = Game('eden')
     g.scene()        # → 'editor' | 'play' | 'title' | 'loading' | 'unknown'
-    g.status()       # → dict with all status.bin fields
+    g.status()       # → Status with all status.bin fields (s.x or s['x'])
     g.press('A')     # press button for 100ms
     g.hold('A', 500) # hold for 500ms
     g.walk_to(200)   # walk right/left until x ≈ 200
@@ -12,12 +12,17 @@ Usage:
     g.fresh()        # kill, boot, navigate to play
 """
 
+import collections
+import mmap
 import struct
 import os
+import sys
 import time
 import subprocess
 from pathlib import Path
 
+from statuswatch import open_ro, use_mmap, wait_status_event
+
 # Max age in seconds before status.bin is considered stale
 STATUS_MAX_AGE = 5.0
 
@@ -57,10 +62,79 @@ STATE_NAMES = {
     122: 'GoalPole', 124: 'GoalEnter',
 }
 
+# Spin (yielding) for the last 2 ms of a timed wait: time.sleep() can
+# oversleep by a millisecond or more, a noticeable slice of a 16.7 ms frame
+_SPIN_S = 0.002
+
+
+def _sleep_until(deadline):
+    """Sleep until time.monotonic() reaches deadline."""
+    remaining = deadline - time.monotonic()
+    if remaining > _SPIN_S:
+        time.sleep(remaining - _SPIN_S)
+    while time.monotonic() < deadline:
+        os.sched_yield()
+
+
+# Button string → mask memo, filled by Game._parse_buttons. Seeded with every
+# single name in either case, so one-button presses never reach the parser.
+_MASKS = {spell: mask for name, mask in BTN.items() for spell in (name, name.lower())}
+
+# input.bin block: buttons, stick_lx, stick_ly
+_S_INPUT = struct.Struct('<Qii')
+# status.bin for Game.status(): the block through is_playing (0x00-0x4B) in
+# one unpack, then scene_change_count @0x8C and the collision fields @0x90
+_S_STATUS = struct.Struct('<IIIIffffIBBBBffIIiB3xIII')
+_S_U32 = struct.Struct('<I')
+_S_COLLISION = struct.Struct('<iB3xi')
+_NO_COLLISION = (-1, 0, 0)  # blocks shorter than 0xA0
+
+
+class Status(collections.namedtuple('Status', (
+        'frame', 'game_phase', 'state', 'powerup', 'x', 'y', 'vx', 'vy',
+        'state_frames', 'in_water', 'is_dead', 'is_goal', 'has_player',
+        'facing', 'gravity', 'buffered', 'polls', 'real_phase', 'theme',
+        'style', 'scene_mode', 'is_playing',
+        'scene_change_count',
+        'collision_index', 'collision_normal', 'collision_slope'))):
+    """Game.status() result, built straight from the unpacked tuple.
+    s.state is the fast path; s['state'] and s.get('state') still work."""
+    __slots__ = ()
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            try:
+                return getattr(self, key)
+            except AttributeError:
+                raise KeyError(key) from None
+        return tuple.__getitem__(self, key)
+
+    def get(self, key, default=None):
+        """Like dict.get."""
+        return getattr(self, key, default)
+
+
 DEATH_STATES = {9, 10, 113, 114}
 GOAL_STATES = {122, 124}
 
 
+def _coursebot_play_steps(slot):
+    """Editor → Coursebot → course `slot` → Play, as (buttons, ms) steps."""
+    row, col = divmod(slot, 4)  # grid is 4 columns wide; slot 0 is preselected
+    return [
+        ('B', 100), (0, 300),        # clear any focus
+        ('PLUS', 150), (0, 1500),    # main menu (wait for animation)
+        ('RIGHT', 100), (0, 300),    # Coursebot icon
+        ('A', 100), (0, 3000),       # enter Coursebot, wait for courses to load
+        *[('RIGHT', 100), (0, 200)] * col,
+        *[('DOWN', 100), (0, 200)] * row,
+        ('A', 100), (0, 2000),       # select course, wait for details
+        # "Play" is the 4th option: Make, Upload, Play Together, Play
+        *[('DOWN', 100), (0, 200)] * 3,
+        ('A', 100),                  # start playing
+    ]
+
+
 class Game:
     """High-level SMM2 game controller."""
 
@@ -85,6 +159,15 @@ class Game:
 
         self.status_path = os.path.join(self.sd, 'status.bin')
         self.input_path = os.path.join(self.sd, 'input.bin')
+        # status.bin kept open + mapped across status() calls; keyed by
+        # (inode, size) so a recreated or resized file is re-mapped
+        self._status_fd = None
+        self._status_mm = None
+        self._status_key = None
+        # input.bin, opened (and mapped where the filesystem allows) on
+        # first write
+        self._input_fd = None
+        self._input_mm = None
 
     # ── Process Detection ───────────────────────────────────
 
@@ -111,59 +194,64 @@ class Game:
     # ── Status ──────────────────────────────────────────────
 
     def status(self, allow_stale=False):
-        """Read status.bin → dict. Returns None if unavailable or stale.
+        """Read status.bin → Status. Returns None if unavailable or stale.
         
         Args:
             allow_stale: If False (default), returns None when file is older
                         than STATUS_MAX_AGE seconds (game not running).
         """
-        # Check file freshness first
-        if not allow_stale:
-            age = self._status_age()
-            if age is None or age > STATUS_MAX_AGE:
-                return None
-        
+        # One stat covers the freshness check and the mapping's validity
+        try:
+            st = os.stat(self.status_path)
+        except OSError:
+            return None
+        if not allow_stale and time.time() - st.st_mtime > STATUS_MAX_AGE:
+            return None
+
+        d = None
         for attempt in range(3):
             try:
-                with open(self.status_path, 'rb') as f:
-                    d = f.read()
+                d = self._status_bytes(st)
                 break
             except (FileNotFoundError, PermissionError):
+                self._close_status()
                 if attempt == 2:
                     return None
                 time.sleep(0.01)
-        if len(d) < 100:
+        if d is None or len(d) < 100:
             return None
 
-        return {
-            'frame':       struct.unpack_from('<I', d, 0x00)[0],
-            'game_phase':  struct.unpack_from('<I', d, 0x04)[0],
-            'state':       struct.unpack_from('<I', d, 0x08)[0],
-            'powerup':     struct.unpack_from('<I', d, 0x0C)[0],
-            'x':           struct.unpack_from('<f', d, 0x10)[0],
-            'y':           struct.unpack_from('<f', d, 0x14)[0],
-            'vx':          struct.unpack_from('<f', d, 0x18)[0],
-            'vy':          struct.unpack_from('<f', d, 0x1C)[0],
-            'state_frames': struct.unpack_from('<I', d, 0x20)[0],
-            'in_water':    d[0x24],
-            'is_dead':     d[0x25],
-            'is_goal':     d[0x26],
-            'has_player':  d[0x27],
-            'facing':      struct.unpack_from('<f', d, 0x28)[0],
-            'gravity':     struct.unpack_from('<f', d, 0x2C)[0],
-            'buffered':    struct.unpack_from('<I', d, 0x30)[0],
-            'polls':       struct.unpack_from('<I', d, 0x34)[0],
-            'real_phase':  struct.unpack_from('<i', d, 0x38)[0],
-            'theme':       d[0x3C],
-            'style':       struct.unpack_from('<I', d, 0x40)[0],
-            'scene_mode':  struct.unpack_from('<I', d, 0x44)[0],
-            'is_playing':  struct.unpack_from('<I', d, 0x48)[0],
-            'scene_change_count': struct.unpack_from('<I', d, 0x8C)[0] if len(d) >= 0x90 else 0,
+        return Status._make(
+            _S_STATUS.unpack_from(d, 0)
+            + ((_S_U32.unpack_from(d, 0x8C)[0] if len(d) >= 0x90 else 0),)
             # Collision data (from decomp discovery)
-            'collision_index': struct.unpack_from('<i', d, 0x90)[0] if len(d) >= 0xA0 else -1,
-            'collision_normal': d[0x94] if len(d) >= 0xA0 else 0,
-            'collision_slope': struct.unpack_from('<i', d, 0x98)[0] if len(d) >= 0xA0 else 0,
-        }
+            + (_S_COLLISION.unpack_from(d, 0x90) if len(d) >= 0xA0 else _NO_COLLISION))
+
+    def _status_bytes(self, st):
+        """status.bin contents for stat result st, from the cached mapping
+        (pread on the cached fd on DrvFS, with STATUS_MMAP=0, or if mmap is
+        refused; see statuswatch.use_mmap)."""
+        key = (st.st_ino, st.st_size)
+        if self._status_key != key:
+            self._close_status()
+            self._status_fd = open_ro(self.status_path)
+            self._status_key = key
+            if use_mmap(self.status_path):
+                try:
+                    self._status_mm = mmap.mmap(self._status_fd, 0, access=mmap.ACCESS_READ)
+                except (ValueError, OSError):
+                    self._status_mm = None
+        if self._status_mm is not None:
+            return self._status_mm[:]
+        return os.pread(self._status_fd, st.st_size, 0)
+
+    def _close_status(self):
+        """Drop the cached status.bin mapping/fd."""
+        if self._status_mm is not None:
+            self._status_mm.close()
+        if self._status_fd is not None:
+            os.close(self._status_fd)
+        self._status_fd = self._status_mm = self._status_key = None
 
     def scene(self):
         """Current screen: 'editor', 'play', 'coursebot', 'title', 'loading', or 'unknown'."""
@@ -208,34 +296,55 @@ class Game:
     # ── Input ───────────────────────────────────────────────
 
     def _write_input(self, buttons=0, lx=0, ly=0):
-        """Write raw input to input.bin. Retries on permission error (NTFS lock)."""
-        data = struct.pack('<Qii', buttons, lx, ly)
+        """Write raw input to input.bin: a store into the shared mapping
+        (pwrite on the kept-open fd where mmap is refused).
+        Retries on permission error (NTFS lock)."""
         for attempt in range(5):
             try:
-                with open(self.input_path, 'wb') as f:
-                    f.write(data)
+                if self._input_fd is None:
+                    self._open_input()
+                if self._input_mm is not None:
+                    _S_INPUT.pack_into(self._input_mm, 0, buttons, lx, ly)
+                else:
+                    os.pwrite(self._input_fd, _S_INPUT.pack(buttons, lx, ly), 0)
                 return
             except PermissionError:
                 time.sleep(0.01)  # 10ms retry
 
+    def _open_input(self):
+        """Open input.bin read/write and map its first block shared."""
+        self._input_fd = os.open(self.input_path, os.O_RDWR | os.O_CREAT, 0o644)
+        if os.fstat(self._input_fd).st_size < _S_INPUT.size:
+            os.ftruncate(self._input_fd, _S_INPUT.size)
+        try:
+            self._input_mm = mmap.mmap(self._input_fd, _S_INPUT.size)
+        except (ValueError, OSError):
+            self._input_mm = None
+
     def _parse_buttons(self, buttons):
-        """Parse button string or int to bitmask."""
+        """Parse button string or int to bitmask (strings memoized)."""
         if isinstance(buttons, int):
             return buttons
-        mask = 0
-        for name in buttons.upper().replace('+', ',').split(','):
-            name = name.strip()
-            if name in BTN:
-                mask |= BTN[name]
-            else:
-                raise ValueError(f"Unknown button: {name}. Valid: {', '.join(sorted(BTN))}")
+        mask = _MASKS.get(buttons)
+        if mask is None:
+            mask = 0
+            for name in buttons.replace('+', ',').split(','):
+                name = name.strip()
+                bit = _MASKS.get(name)
+                if bit is None:
+                    name = name.upper()
+                    if name not in BTN:
+                        raise ValueError(f"Unknown button: {name}. Valid: {', '.join(sorted(BTN))}")
+                    bit = BTN[name]
+                mask |= bit
+            _MASKS[buttons] = mask
         return mask
 
     def press(self, buttons, ms=100):
         """Press button(s) for duration then release. Accepts 'A', 'L+R', 0x4000, etc."""
         mask = self._parse_buttons(buttons)
         self._write_input(mask)
-        time.sleep(ms / 1000)
+        _sleep_until(time.monotonic() + ms / 1000)
         self._write_input(0)
 
     def hold(self, buttons, ms=1000):
@@ -245,13 +354,28 @@ class Game:
     def stick(self, lx=0, ly=0, ms=100):
         """Push analog stick for duration."""
         self._write_input(0, lx, ly)
-        time.sleep(ms / 1000)
+        _sleep_until(time.monotonic() + ms / 1000)
         self._write_input(0)
 
     def release(self):
         """Release all inputs."""
         self._write_input(0)
 
+    def sequence(self, steps):
+        """Play [(buttons, ms), ...]: write each step, then wait its duration.
+
+        Step deadlines are absolute (monotonic), so a long menu walk doesn't
+        accumulate sleep drift. Ends with all inputs released.
+        """
+        # Parse every step up front: a bad name raises before anything is held
+        steps = [(self._parse_buttons(buttons), ms) for buttons, ms in steps]
+        deadline = time.monotonic()
+        for mask, ms in steps:
+            self._write_input(mask)
+            deadline += ms / 1000
+            _sleep_until(deadline)
+        self._write_input(0)
+
     # ── Movement ────────────────────────────────────────────
 
     def walk_to(self, target_x, timeout=10, use_analog=False):
@@ -300,15 +424,23 @@ class Game:
         self.press('A', hold_ms)
 
     def wait_for(self, condition, timeout=10, poll_interval=0.1):
-        """Wait until condition(status) is True. Returns status or None."""
+        """Wait until condition(status) is True. Returns status or None.
+
+        Each pause between polls ends early when the hook rewrites
+        status.bin (inotify), so a change is seen within about a frame.
+        """
         deadline = time.time() + timeout
         while time.time() < deadline:
             s = self.status()
             if s and condition(s):
                 return s
-            time.sleep(poll_interval)
+            self._wait_status_change(min(poll_interval, max(deadline - time.time(), 0)))
         return None
 
+    def _wait_status_change(self, timeout):
+        """Block up to timeout seconds for status.bin to be rewritten."""
+        wait_status_event(timeout, self.sd)
+
     # ── Navigation ──────────────────────────────────────────
 
     def recover(self, timeout=30, mode='edit'):
@@ -336,16 +468,6 @@ class Game:
                 )
                 return result is not None
 
-        if sc == 'editor':
-            # Clear any UI focus, then MINUS to play
-            self.press('B', 100)
-            time.sleep(0.3)
-            self.press('X', 100)
-            time.sleep(0.3)
-            self.press('MINUS', 200)
-            result = self.wait_for(lambda s: s['scene_mode'] == SCENE_PLAY, timeout=10)
-            return result is not None
-
         if sc == 'title':
             # L+R → A → editor → play
             self.hold('L+R', 1500)
@@ -354,7 +476,13 @@ class Game:
             if not self.wait_for(lambda s: s['scene_mode'] == SCENE_EDITOR, timeout=15):
                 return False
             time.sleep(1)
-            return self.recover(mode=mode)  # recurse from editor
+            sc = 'editor'  # falls through to the editor → play step
+
+        if sc == 'editor':
+            # Clear any UI focus, then MINUS to play
+            self.sequence([('B', 100), (0, 300), ('X', 100), (0, 300), ('MINUS', 200)])
+            result = self.wait_for(lambda s: s['scene_mode'] == SCENE_PLAY, timeout=10)
+            return result is not None
 
         return False
 
@@ -386,45 +514,8 @@ class Game:
         if not self.to_editor():
             return False
         
-        # Clear any focus
-        self.press('B', 100)
-        time.sleep(0.3)
-        
-        # PLUS → Main Menu
-        self.press('PLUS', 150)
-        time.sleep(1.5)  # wait for menu animation
-        
-        # RIGHT → Coursebot icon
-        self.press('RIGHT', 100)
-        time.sleep(0.3)
-        
-        # A → Enter Coursebot
-        self.press('A', 100)
-        time.sleep(3.0)  # wait for coursebot to load courses
-        
-        # Navigate to slot (grid is 4 columns wide)
-        # slot 0 is already selected, navigate for others
-        row = slot // 4
-        col = slot % 4
-        for _ in range(col):
-            self.press('RIGHT', 100)
-            time.sleep(0.2)
-        for _ in range(row):
-            self.press('DOWN', 100)
-            time.sleep(0.2)
-        
-        # A → Select course
-        self.press('A', 100)
-        time.sleep(2.0)  # wait for course details
-        
-        # Navigate to "Play" option (4th option: Make, Upload, Play Together, Play)
-        for _ in range(3):
-            self.press('DOWN', 100)
-            time.sleep(0.2)
-        
-        # A → Start playing
-        self.press('A', 100)
-        
+        self.sequence(_coursebot_play_steps(slot))
+
         # Wait for coursebot play mode (scene 7)
         # Note: has_player may be 0 in coursebot mode, check state + position instead
         result = self.wait_for(
@@ -493,13 +584,18 @@ class Game:
         return result.returncode == 0
 
     def screenshot(self, out_path='/mnt/c/temp/smm2_debug/capture.png'):
-        """Take screenshot of emulator window."""
-        tools_dir = Path(__file__).parent
-        result = subprocess.run(
-            ['python3', str(tools_dir / 'automate.py'), f'--{self.emu}', 'screenshot'],
-            capture_output=True, text=True, timeout=10
-        )
-        return out_path if result.returncode == 0 else None
+        """Take screenshot of emulator window.
+
+        Runs in-process so automate's PowerShell session (and its compiled
+        capture code) is reused across calls instead of started per shot.
+        """
+        tools_dir = str(Path(__file__).parent)
+        if tools_dir not in sys.path:
+            sys.path.insert(0, tools_dir)
+        import automate
+        if automate._use_eden != (self.emu == 'eden'):
+            automate.set_emulator(self.emu)
+        return automate.screenshot(out_path)
 
     # ── Quick Reset ──────────────────────────────────────────
 
@@ -0,0 +1,145 @@
+"""statuswatch.py — Wait for and open status.bin without side effects.
+
+Shared by automate, smm2 and emu_session. Importing this module reads no
+argv, .env or environment and registers nothing, so library callers can use
+it without pulling in automate's CLI setup.
+
+Usage:
+    fd = open_ro(path)                       # read-only, no atime updates
+    if use_mmap(path): ...                   # mapping vs pread for status.bin
+    changed = wait_status_event(0.5, sd_dir) # True once status.bin changes
+"""
+
+import functools
+import os
+import select
+import struct
+import sys
+import time
+
+_O_NOATIME = getattr(os, "O_NOATIME", 0)  # Linux only
+
+
+def open_ro(path):
+    """os.open(path) read-only, with O_NOATIME where the kernel allows it:
+    polled files would otherwise get an inode atime update per read. Falls
+    back to a plain open when the flag is refused (EPERM: not the owner)."""
+    if _O_NOATIME:
+        try:
+            return os.open(path, os.O_RDONLY | _O_NOATIME)
+        except PermissionError:
+            pass
+    return os.open(path, os.O_RDONLY)
+
+
+# Windows drives under WSL (DrvFS over 9p): the hook writes status.bin from
+# the Windows side, and an existing mapping isn't reliably refreshed there
+_DRVFS_TYPES = ('9p', 'drvfs', 'v9fs')
+
+
+@functools.lru_cache(maxsize=None)
+def _mounts():
+    """(mountpoint, fstype) pairs from /proc/mounts, longest mountpoint first."""
+    try:
+        with open('/proc/mounts') as f:
+            rows = [line.split()[1:3] for line in f]
+    except OSError:
+        return ()
+    rows = [(mnt.replace('\\040', ' '), fstype) for mnt, fstype in rows]
+    return tuple(sorted(rows, key=lambda row: -len(row[0])))
+
+
+def use_mmap(path):
+    """Whether status.bin at `path` should be read through mmap.
+
+    STATUS_MMAP=1 or 0 forces the choice. Unset (or empty), files on a
+    DrvFS/9p mount use pread and everything else is mapped.
+    """
+    forced = os.environ.get('STATUS_MMAP', '')
+    if forced:
+        return forced != '0'
+    path = os.path.abspath(path)
+    for mnt, fstype in _mounts():
+        if path == mnt or path.startswith(mnt.rstrip('/') + '/'):
+            return fstype not in _DRVFS_TYPES
+    return True
+
+
+# inotify watch on the SD directory so waits wake as soon as the hook
+# rewrites status.bin. (fd, watched_dir), or False once inotify proved
+# unavailable. Windows-side writes on a DrvFS mount raise no events; callers'
+# poll schedules still bound every wait there.
+_inotify = None
+_IN_MODIFY = 0x002
+_IN_CLOSE_WRITE = 0x008
+_IN_CREATE = 0x100
+_STATUS_EVENTS = _IN_MODIFY | _IN_CLOSE_WRITE | _IN_CREATE
+_IN_NONBLOCK = 0o4000
+_IN_CLOEXEC = 0o2000000
+_S_INOTIFY_EVENT = struct.Struct('iIII')    # wd, mask, cookie, len
+
+
+def _status_inotify(directory):
+    """Return an inotify fd watching `directory`, or None if unsupported."""
+    global _inotify
+    if _inotify is False:
+        return None
+    if _inotify is None and not sys.platform.startswith('linux'):
+        _inotify = False
+        return None
+    if _inotify is not None:
+        if _inotify[1] == directory:
+            return _inotify[0]
+        os.close(_inotify[0])
+        _inotify = None
+    try:
+        import ctypes
+        libc = ctypes.CDLL(None, use_errno=True)
+        fd = libc.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+    except (OSError, AttributeError):
+        _inotify = False
+        return None
+    if fd < 0:
+        _inotify = False
+        return None
+    if libc.inotify_add_watch(fd, os.fsencode(directory), _STATUS_EVENTS) < 0:
+        os.close(fd)
+        return None  # directory missing; retry on the next wait
+    _inotify = (fd, directory)
+    return fd
+
+
+def _drain_inotify(fd):
+    """Consume queued events; True if any of them touched status.bin."""
+    hit = False
+    while True:
+        try:
+            buf = os.read(fd, 4096)
+        except BlockingIOError:
+            return hit
+        pos = 0
+        while pos < len(buf):
+            _, _, _, name_len = _S_INOTIFY_EVENT.unpack_from(buf, pos)
+            pos += _S_INOTIFY_EVENT.size
+            if buf[pos:pos + name_len].rstrip(b'\0') == b'status.bin':
+                hit = True
+            pos += name_len
+
+
+def wait_status_event(timeout_s, directory):
+    """Block up to timeout_s for status.bin in `directory` to change.
+
+    Returns True if it changed, False on timeout. Without inotify this is
+    a plain sleep.
+    """
+    fd = _status_inotify(directory) if directory else None
+    if fd is None:
+        time.sleep(timeout_s)
+        return False
+    deadline = time.monotonic() + timeout_s
+    while True:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0 or not select.select([fd], [], [], remaining)[0]:
+            return False
+        if _drain_inotify(fd):
+            return True
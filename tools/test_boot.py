@@ -89,6 +89,14 @@ with tempfile.TemporaryDirectory() as tmpdir:
     test("has_player=1", s and s.get('has_player') == 1)
     test("pos_x=150.0", s and abs(s['pos_x'] - 150.0) < 0.1)
     test("pos_y=64.0", s and abs(s['pos_y'] - 64.0) < 0.1)
+    test("attribute access (s.player_state)", s and s.player_state == 3)
+    test("unchanged block → same Status, not re-decoded", automate.read_status() is s)
+    v1 = automate._decode_status(data[:32])
+    test("v1 block: missing field → get() default", v1.get('has_player', False) is False)
+    test("_peek_frame=500", automate._peek_frame() == 500)
+    test("_peek_has_player=1", automate._peek_has_player() == 1)
+    s = automate.latest_status(timeout_s=0.5)
+    test("latest_status (sampler) frame=500", s and s['frame'] == 500)
     
     # Test no file
     os.remove(status_path)
@@ -118,7 +126,12 @@ with tempfile.TemporaryDirectory() as tmpdir:
     automate._save_state("playing")
     state = automate.detect_state()
     test("state 1 + nav=playing → playing", state == "playing", f"got {state}")
-    
+
+    # Player but nav state knows nothing → title screen's cosmetic Mario
+    automate._save_state("unknown")
+    state = automate.detect_state()
+    test("state 1 + nav=unknown → title", state == "title", f"got {state}")
+
     # No player
     data = make_status_bin(state=0, has_player=0)
     with open(status_path, 'wb') as f:
@@ -133,9 +146,98 @@ with tempfile.TemporaryDirectory() as tmpdir:
         f.write(data)
     state = automate.detect_state()
     test("real_phase=-1 → unknown (loading)", state == "unknown", f"got {state}")
+
+    # A rewrite inside one mtime tick (coarse on drvfs) must still be seen:
+    # detect_state reads the mapped block, not file metadata
+    st = os.stat(status_path)
+    with open(status_path, 'r+b') as f:
+        f.write(make_status_bin(state=43, has_player=1))
+    os.utime(status_path, ns=(st.st_atime_ns, st.st_mtime_ns))
+    state = automate.detect_state()
+    test("rewrite with unchanged mtime → editor", state == "editor", f"got {state}")
+    
+    # nav state is written on exit (or flush); save it before tmpdir goes away
+    automate._flush_state()
+    test("nav_state.txt written on flush",
+         open(automate._STATE_FILE).read() == "main_menu")
+
+    # --invalidate-state-cache: another process's rename is picked up via stat
+    automate._no_state_cache = True
+    test("shared mode: reads file", automate._load_state() == "main_menu")
+    with open(automate._STATE_FILE + ".new", 'w') as f:
+        f.write("editor")
+    os.replace(automate._STATE_FILE + ".new", automate._STATE_FILE)
+    test("shared mode: external write seen", automate._load_state() == "editor")
+    automate._no_state_cache = False
     
     automate.SD_BASE = old_sd
 
+# Test 2a': fields.csv tail read
+print("\n--- read_fields_csv ---")
+with tempfile.TemporaryDirectory() as tmpdir:
+    automate.SD_BASE = tmpdir
+    with open(os.path.join(tmpdir, "fields.csv"), 'w') as f:
+        f.write("frame,state,x\n")
+        for i in range(1000):               # well past the 4 KB tail window
+            f.write(f"{i},1,{i * 1.5}\n")
+        f.write("1000,2,15")                # row still being written
+    row = automate.read_fields_csv()
+    test("last complete row from tail", row == {'frame': '999', 'state': '1', 'x': '1498.5'},
+         f"got {row}")
+    with open(os.path.join(tmpdir, "fields.csv"), 'w') as f:
+        f.write("frame,state,x\n0,1,0")      # header + first row mid-write
+    test("header only → None", automate.read_fields_csv() is None)
+    automate.SD_BASE = old_sd
+
+# Test 2a'': status_ring.bin history
+print("\n--- status_history ---")
+with tempfile.TemporaryDirectory() as tmpdir:
+    automate.SD_BASE = tmpdir
+    test("no ring file → []", automate.status_history() == [])
+    ring = bytearray(64 * 160)
+    for frame in (130, 65, 64):             # slots 2, 1, 0; the rest empty
+        blk = make_status_bin(frame=frame, state=1)
+        ring[(frame % 64) * 160:(frame % 64) * 160 + len(blk)] = blk
+    with open(os.path.join(tmpdir, "status_ring.bin"), 'wb') as f:
+        f.write(ring)
+    frames = [s.frame for s in automate.status_history()]
+    test("ring sorted by frame, empty slots skipped", frames == [64, 65, 130], f"got {frames}")
+    test("status_history(2) → newest two",
+         [s.frame for s in automate.status_history(2)] == [65, 130])
+    automate.SD_BASE = old_sd
+
+# Test 2a: full_load_test_level situation table
+print("\n--- _load_situation ---")
+test("phase 3 + player + 43 → editor", automate._load_situation(3, 1, 43) == "editor")
+test("phase 3 + player + 1 → playing", automate._load_situation(3, 1, 1) == "playing")
+test("phase 3 + no player → no_player", automate._load_situation(3, 0, 0) == "no_player")
+test("phase -1 → loading", automate._load_situation(-1, 0, 0) == "loading")
+test("no status → title", automate._load_situation(-99, False, 0) == "title")
+test("load actions fit one input queue",
+     all(len(steps) <= automate._QUEUE_MAX for _, steps in automate._LOAD_ACTIONS.values()))
+
+# Test 2a': goto route planning
+print("\n--- _plan_route ---")
+test("editor → coursebot via main menu",
+     automate._plan_route("editor", "coursebot") == ("main_menu", "coursebot"))
+test("title → playing via coursebot",
+     automate._plan_route("title", "playing")[-2:] == ("coursebot", "playing"))
+test("no route → None", automate._plan_route("unknown", "playing") is None)
+with tempfile.TemporaryDirectory() as tmpdir:
+    automate.SD_BASE = tmpdir
+    with open(os.path.join(tmpdir, "status.bin"), 'wb') as f:
+        f.write(make_status_bin(state=43, has_player=1))   # stuck in the editor
+    hops = []
+    old_gated = automate._play_gated
+    automate._play_gated = lambda steps, gate, label: hops.append(label) or False
+    ok = automate.goto("playing")
+    automate._play_gated = old_gated
+    test("gate never met → goto False after replays",
+         not ok and len(hops) == automate._MAX_REPLANS + 1, f"ok={ok} hops={hops}")
+    test("unreached hop not saved", automate._load_state() != "playing")
+    automate._close_status_fd()
+    automate.SD_BASE = old_sd
+
 # Test 2b: wait_for_change
 print("\n--- wait_for_change ---")
 with tempfile.TemporaryDirectory() as tmpdir:
@@ -156,9 +258,34 @@ with tempfile.TemporaryDirectory() as tmpdir:
         f.write(data)
     result = automate.wait_for_change('player_state', timeout_s=0.5, initial=1)
     test("wait_for_change detects change", result is not None and result['player_state'] == 5)
+    test("wait_for_change on a field without a peek times out",
+         automate.wait_for_change('no_such_field', timeout_s=0.1) is None)
+    
+    # Frame stuck at 101: wait_frames times out, zero frames returns at once
+    test("wait_frames timeout when frame stuck", automate.wait_frames(2, timeout_s=0.2) is None)
+    s = automate.wait_frames(0)
+    test("wait_frames(0) → current status", s is not None and s['frame'] == 101)
     
     automate.SD_BASE = old_sd
 
+# Test 2b': adaptive poll schedule
+print("\n--- _poll_schedule ---")
+offsets = list(automate._poll_schedule('_test_fixed', 0.3, 0.1))
+test("no history → fixed interval", [round(o, 2) for o in offsets] == [0.0, 0.1, 0.2, 0.3],
+     f"got {offsets}")
+for t in (2.3, 2.4, 2.5, 2.6, 2.8):
+    automate._record_poll('_test_adaptive', t)
+offsets = list(automate._poll_schedule('_test_adaptive', 10, 0.1))
+gaps = [b - a for a, b in zip(offsets, offsets[1:])]
+test("history → no gap longer than interval", max(gaps) <= 0.1 + 1e-9, f"got {max(gaps):.3f}")
+near = [b - a for a, b in zip(offsets, offsets[1:]) if 2.2 < a < 2.7]
+test("history → denser polls around past changes", near and max(near) < 0.1,
+     f"got {near[:3]}")
+test("schedule ends at timeout", offsets[-1] == 10)
+offsets = list(automate._poll_schedule('_test_adaptive', 3, 0.02))
+test("wait_for_player's 20 ms is a bound with history",
+     max(b - a for a, b in zip(offsets, offsets[1:])) <= 0.02 + 1e-9)
+
 # Test 2c: is_fresh
 print("\n--- is_fresh ---")
 with tempfile.TemporaryDirectory() as tmpdir:
@@ -182,12 +309,56 @@ test("L,R = 0xC0", automate.parse_buttons("L,R") == 0xC0, f"got 0x{automate.pars
 test("ZL,ZR = 0x300", automate.parse_buttons("ZL,ZR") == 0x300)
 test("A,B,RIGHT = 0x4003", automate.parse_buttons("A,B,RIGHT") == 0x4003,
      f"got 0x{automate.parse_buttons('A,B,RIGHT'):x}")
+test("L+R = 0xC0", automate.parse_buttons("L+R") == 0xC0)
+test("r, l (slow path) = 0xC0", automate.parse_buttons("r, l") == 0xC0)
+test("Btn.L | Btn.R = parse_buttons('L,R')",
+     automate.Btn.L | automate.Btn.R == automate.parse_buttons("L,R"))
+
+# Test 3b: input.bin step queue
+print("\n--- queue_input ---")
+with tempfile.TemporaryDirectory() as tmpdir:
+    old_input = automate.INPUT_BIN
+    automate.INPUT_BIN = os.path.join(tmpdir, "input.bin")
+    frames = automate.queue_input([("DOWN", 100), (0, 300), ("A", 10)])
+    automate.queue_input([("B", 50)])
+    with open(automate.INPUT_BIN, 'rb') as f:
+        raw = f.read()
+    automate._close_input_fd()
+    automate.INPUT_BIN = old_input
+    test("frames = 6+18+1", frames == 25, f"got {frames}")
+    test("seq bumped per queue, count", struct.unpack_from('<II', raw, 16) == (2, 1))
+    test("step = (B, 3 frames)", struct.unpack_from('<QI', raw, 24) == (0x02, 3))
+
+# play_queued on a stalled hook: poll count never advances → cancelled
+with tempfile.TemporaryDirectory() as tmpdir:
+    old_sd, old_input = automate.SD_BASE, automate.INPUT_BIN
+    automate.SD_BASE = tmpdir
+    automate.INPUT_BIN = os.path.join(tmpdir, "input.bin")
+    with open(os.path.join(tmpdir, "status.bin"), 'wb') as f:
+        f.write(make_status_bin(frame=500))
+    ok = automate.play_queued([("A", 10)])
+    with open(automate.INPUT_BIN, 'rb') as f:
+        raw = f.read()
+    automate._close_input_fd()
+    automate._close_status_fd()
+    automate.SD_BASE, automate.INPUT_BIN = old_sd, old_input
+    test("play_queued timeout → False", ok is False)
+    test("timeout cancels: new seq, no steps, live released",
+         struct.unpack_from('<II', raw, 16) == (2, 0) and struct.unpack_from('<Q', raw, 0)[0] == 0)
 
 # Test 4: PID tracking
 print("\n--- emu_session.is_running ---")
 import emu_session
 # With no PID file, should fall back to process scan (returns False if not running)
 test("is_running returns bool", isinstance(emu_session.is_running("eden"), bool))
+old_kill, old_procs = emu_session.TASKKILL, emu_session.get_processes
+emu_session.get_processes = lambda: {'eden': [{'pid': 2, 'exe': 'eden.exe', 'mem_kb': 0}]}
+emu_session.TASKKILL = 'true'
+test("taskkill exit 0 → every PID killed", emu_session._taskkill([{'pid': 1}, {'pid': 2}]) == set())
+emu_session.TASKKILL = 'false'
+test("taskkill failure → PIDs tasklist still shows",
+     emu_session._taskkill([{'pid': 1}, {'pid': 2}]) == {2})
+emu_session.TASKKILL, emu_session.get_processes = old_kill, old_procs
 
 # Test 5: screenshot (no process = returns None)
 print("\n--- screenshot ---")
@@ -196,7 +367,17 @@ old_eden = _auto_ss._use_eden
 _auto_ss._use_eden = True  # Force eden mode
 result = _auto_ss.screenshot()  # Should fail gracefully (no eden running... or succeed if running)
 test("screenshot returns path or None", result is None or isinstance(result, str))
+test("_wsl_to_win /mnt/d + quote",
+     _auto_ss._wsl_to_win("/mnt/d/o'k/a.png") == ("D:\\o'k\\a.png", "D:\\o''k\\a.png"))
+result = _auto_ss.screenshot_async().result(timeout=30)
+test("screenshot_async resolves to path or None", result is None or isinstance(result, str))
 _auto_ss._use_eden = old_eden
+old_ps = _auto_ss._ps_proc
+_auto_ss._ps_proc = _auto_ss.subprocess.Popen(["cat"], stdin=_auto_ss.subprocess.PIPE,
+                                              stdout=_auto_ss.subprocess.DEVNULL)
+_auto_ss._stop_powershell()
+test("_stop_powershell ends the shared shell", _auto_ss._ps_proc.poll() is not None)
+_auto_ss._ps_proc = old_ps
 
 # Test 6: status.bin byte layout
 print("\n--- status.bin layout ---")
@@ -208,6 +389,76 @@ test("pos_x at [16:20]", abs(struct.unpack('<f', data[16:20])[0] - 100.0) < 0.01
 test("pos_y at [20:24]", abs(struct.unpack('<f', data[20:24])[0] - 200.0) < 0.01)
 test("has_player at [39]", data[39] == 1)
 test("theme at [60]", data[60] == 5)
+full = bytearray(data) + bytearray(160 - len(data))
+test("short block can't be torn", not automate._is_torn(data))
+struct.pack_into('<I', full, 0x9C, 1234)
+test("frame_check == frame → whole", not automate._is_torn(full))
+struct.pack_into('<I', full, 0x9C, 1233)
+test("frame_check != frame → torn", automate._is_torn(full))
+with tempfile.TemporaryDirectory() as tmpdir:
+    automate.SD_BASE = tmpdir
+    struct.pack_into('<I', full, 0x9C, 1234)
+    with open(os.path.join(tmpdir, "status.bin"), 'wb') as f:
+        f.write(full)
+    whole = automate.read_status()
+    struct.pack_into('<I', full, 0x00, 1235)             # new frame, write in progress
+    struct.pack_into('<I', full, 0x9C, 1234)
+    with open(os.path.join(tmpdir, "status.bin"), 'r+b') as f:
+        f.write(full)
+    test("all copies torn → previous whole Status",
+         whole is not None and whole.frame == 1234 and automate.read_status() is whole)
+    test("torn block never cached", automate._last_block != bytes(full))
+    automate._close_status_fd()
+    automate.SD_BASE = old_sd
+
+# The Python readers each carry their own status.bin layout: check automate's
+# and smm2's decoders against emu_session.STATUS_FIELDS so they can't drift
+print("\n--- status.bin readers agree ---")
+block = bytearray(0xA0)
+for i, (offset, size, fmt, name) in enumerate(emu_session.STATUS_FIELDS):
+    struct.pack_into('<' + fmt, block, offset, i + 0.5 if fmt == 'f' else i + 1)
+ref = emu_session._parse_status_fields(bytes(block))
+a = automate._decode_status(bytes(block))
+test("automate.Status matches STATUS_FIELDS",
+     all(a[n] == ref[{'input_polls': 'input_poll_count'}.get(n, n)] for n in a._fields))
+import smm2
+with tempfile.TemporaryDirectory() as tmpdir:
+    with open(os.path.join(tmpdir, "status.bin"), 'wb') as f:
+        f.write(block)
+    old_env = os.environ.get('EDEN_SD_PATH')
+    os.environ['EDEN_SD_PATH'] = tmpdir
+    g = smm2.Game('eden')
+    st = g.status()
+    g._close_status()
+    if old_env is None:
+        del os.environ['EDEN_SD_PATH']
+    else:
+        os.environ['EDEN_SD_PATH'] = old_env
+smm2_names = {'state': 'player_state', 'powerup': 'powerup_id', 'x': 'pos_x', 'y': 'pos_y',
+              'vx': 'vel_x', 'vy': 'vel_y', 'buffered': 'buffered_action',
+              'polls': 'input_poll_count', 'real_phase': 'real_game_phase',
+              'theme': 'course_theme', 'style': 'game_style'}
+test("smm2.Game.status() matches STATUS_FIELDS",
+     st is not None and all(st[k] == ref[smm2_names.get(k, k)]
+                            for k in st._fields if smm2_names.get(k, k) in ref))
+import statuswatch
+old_mounts, old_mmap_env = statuswatch._mounts, os.environ.pop('STATUS_MMAP', None)
+statuswatch._mounts = lambda: (('/mnt/c', '9p'), ('/', 'ext4'))
+test("DrvFS status.bin → pread", not statuswatch.use_mmap('/mnt/c/sd/status.bin'))
+test("local status.bin → mmap", statuswatch.use_mmap('/mnt/cd/status.bin'))
+os.environ['STATUS_MMAP'] = '1'
+test("STATUS_MMAP=1 forces mmap", statuswatch.use_mmap('/mnt/c/sd/status.bin'))
+statuswatch._mounts = old_mounts
+if old_mmap_env is None:
+    del os.environ['STATUS_MMAP']
+else:
+    os.environ['STATUS_MMAP'] = old_mmap_env
+import subprocess
+probe = subprocess.run(
+    [sys.executable, "-c", "import sys, smm2, emu_session; print('automate' in sys.modules)"],
+    cwd=os.path.dirname(os.path.abspath(__file__)), capture_output=True, text=True)
+test("smm2/emu_session import without automate", probe.stdout.strip() == "False",
+     probe.stdout + probe.stderr)
 
 
 # ============================================================
@@ -10,15 +10,15 @@ STATUS = os.path.join(SD, 'smm2-hooks', 'status.bin')
 
 MODE_NAMES = {0: 'EDITOR', 1: 'PLAY', 2: 'GOAL_ANIM', 3: 'DEATH_ANIM'}
 
+# status.bin v2 block up to input_polls (include/smm2/status.h)
+_S_STATUS = struct.Struct('<IIIIffffIBBBBffII')
+
 def read_status():
     with open(STATUS, 'rb') as f:
         data = f.read(64)
-    frame, mode, state, powerup = struct.unpack_from('<IIII', data, 0)
-    px, py = struct.unpack_from('<ff', data, 16)
-    vx, vy = struct.unpack_from('<ff', data, 24)
-    state_frames = struct.unpack_from('<I', data, 32)
-    in_water, is_dead, is_goal, has_player = struct.unpack_from('<BBBB', data, 36)
-    facing, gravity, buffered, polls = struct.unpack_from('<ffII', data, 40)
+    (frame, mode, state, powerup, px, py, vx, vy, state_frames,
+     in_water, is_dead, is_goal, has_player,
+     facing, gravity, buffered, polls) = _S_STATUS.unpack_from(data, 0)
     return {
         'frame': frame, 'mode': mode, 'state': state, 'powerup': powerup,
         'x': px, 'y': py, 'vx': vx, 'vy': vy,